@@ -7,12 +7,15 @@ from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register
 from astrbot.api.message_components import Plain, At, Image
 import asyncio
-import os
+import atexit
+import time
 from pathlib import Path
 
 # 导入重构后的组件
 from src.domain.models.configuration import BuildConfiguration, ScriptConfiguration
 from src.domain.models.entities import BuildStrategy, ProgressUpdate, BuildResult
+from src.domain.formatting import format_duration
+from src.domain.exceptions import TaskQueueError
 from src.infrastructure.configuration.manager import ConfigurationManager
 from src.infrastructure.logging.logger import LoggerFactory
 from src.infrastructure.error_handling.handler import ErrorHandler
@@ -24,16 +27,76 @@ from src.infrastructure.ai_integration.providers import AIProviderFactory
 from src.application.services.build_orchestrator import BuildOrchestrator
 from src.application.services.statistics_manager import StatisticsManager
 
+# 插件目录及数据文件路径 (导入时计算一次)
+_PLUGIN_DIR = Path(__file__).resolve().parent
+_CONFIG_PATH = str(_PLUGIN_DIR / "config.json")
+_QUEUE_PATH = str(_PLUGIN_DIR / "task_queue.json")
+
+# 构建状态消息模板
+_STATUS_TEMPLATE = (
+    "🔧 **构建系统状态**\n\n"
+    "🏗️ **当前任务**: {task_line}\n"
+    "📋 **队列**: {queue_size} 个任务\n"
+    "🌐 **Web服务**: {web_line}\n"
+    "🤖 **AI服务**: {ai_name} ({ai_available})"
+)
+_TASK_RUNNING_TEMPLATE = "[{branch}] {strategy} ({status})"
+_WEB_RUNNING_TEMPLATE = "运行中 (http://{host}:{port})"
+
+# 各命令的错误上下文模板 (导入时构建一次)
+_COMMAND_CONTEXTS = {
+    command: {'command': command}
+    for command in (
+        'pack', 'build_stats', 'build_stop', 'build_status',
+        'build_queue', 'build_clear_queue'
+    )
+}
+
+
+def _error_context(command: str, **extra) -> dict:
+    """基于预构建模板生成命令错误上下文"""
+    context = _COMMAND_CONTEXTS[command].copy()
+    if extra:
+        context.update(extra)
+    return context
+
 
 @register("astrbot_plugin_Game_packer", "YourName", "Unreal打包插件", "4.0.0")
 class UnrealBuilderRefactored(Star):
     """重构版本的 UnrealBuilder - 保持完全兼容性的同时提供优化架构"""
     
+    __slots__ = (
+        # 组件
+        'logger', 'config_manager', 'build_config', 'script_config', 'error_handler',
+        'file_manager', 'task_queue', 'task_executor', 'web_server', 'ai_provider',
+        'stats_manager', 'build_orchestrator',
+        # 内部状态
+        '_progress_queue', '_progress_consumer_task',
+        '_pack_queue', '_pack_workers', '_stats_queue', '_stats_writer_task',
+        '_status_cache', '_status_lock', '_closed',
+    )
+    
+    # 进度更新批处理设置
+    PROGRESS_QUEUE_SIZE = 1024
+    PROGRESS_BATCH_WINDOW = 0.05  # seconds
+    
+    # 打包请求工作池设置
+    PACK_WORKER_COUNT = 4
+    PACK_QUEUE_SIZE = 100
+    
+    # 构建耗时统计批量写入设置
+    STATS_BATCH_SIZE = 32
+    STATS_FLUSH_INTERVAL = 0.5  # seconds
+    
+    # 构建状态快照缓存时间
+    STATUS_CACHE_TTL = 0.5  # seconds
+    
     def __init__(self, context: Context):
         super().__init__(context)
         print("[GamePacker] v4.0.0 加载: 重构优化版 (模块化架构)")
         
         # 初始化组件
+        self._closed = False
         self._initialize_components()
         
         # 设置回调
@@ -41,17 +104,28 @@ class UnrealBuilderRefactored(Star):
         
         # 启动服务
         asyncio.create_task(self._start_services())
+        
+        # 启动进度批处理消费者
+        self._progress_consumer_task = asyncio.create_task(self._consume_progress_updates())
+        
+        # 启动打包请求工作池
+        self._pack_workers = [
+            asyncio.create_task(self._pack_worker()) for _ in range(self.PACK_WORKER_COUNT)
+        ]
+        
+        # 启动统计数据批量写入任务
+        self._stats_writer_task = asyncio.create_task(self._write_build_times())
+        
+        # 进程退出时的兜底清理 (正常卸载走 terminate/aclose)
+        atexit.register(self._close_sync)
     
     def _initialize_components(self):
         """初始化所有组件"""
-        # 配置文件路径
-        config_file = os.path.join(os.path.dirname(__file__), "config.json")
-        
         # 创建日志器
         self.logger = LoggerFactory.create_logger("UnrealBuilder", "INFO")
         
         # 配置管理器
-        self.config_manager = ConfigurationManager(config_file, self.logger)
+        self.config_manager = ConfigurationManager(_CONFIG_PATH, self.logger)
         self.build_config = self.config_manager.get_build_config()
         self.script_config = ScriptConfiguration()
         
@@ -62,8 +136,7 @@ class UnrealBuilderRefactored(Star):
         self.file_manager = SecureFileManager(self.build_config, self.logger)
         
         # 任务队列和执行器
-        queue_persistence_file = os.path.join(os.path.dirname(__file__), "task_queue.json")
-        self.task_queue = ThreadSafeTaskQueue(self.logger, queue_persistence_file)
+        self.task_queue = ThreadSafeTaskQueue(self.logger, _QUEUE_PATH)
         self.task_executor = TaskExecutor(self.logger)
         
         # Web 服务器
@@ -77,8 +150,19 @@ class UnrealBuilderRefactored(Star):
             'max_retries': self.build_config.ai_max_retries
         })
         
+        # 进度更新缓冲队列 (由后台消费者批量处理)
+        self._progress_queue: asyncio.Queue = asyncio.Queue(maxsize=self.PROGRESS_QUEUE_SIZE)
+        
+        # 打包请求队列 (由固定数量的工作协程处理)
+        self._pack_queue: asyncio.Queue = asyncio.Queue(maxsize=self.PACK_QUEUE_SIZE)
+        
         # 统计管理器
         self.stats_manager = StatisticsManager(self.build_config, self.logger)
+        self._stats_queue: asyncio.Queue = asyncio.Queue()
+        
+        # 构建状态快照缓存 (合并短时间内的并发查询)
+        self._status_cache: tuple = (0.0, None)
+        self._status_lock = asyncio.Lock()
         
         # 构建编排器
         self.build_orchestrator = BuildOrchestrator(
@@ -112,7 +196,10 @@ class UnrealBuilderRefactored(Star):
             await self.web_server.start()
             
             # 启动配置热重载
-            self.config_manager.start_hot_reload()
+            await self.config_manager.start_hot_reload_async()
+            
+            # 继续执行上次未完成的排队任务
+            await self.build_orchestrator.resume_queued_tasks()
             
             self.logger.info("所有服务启动完成")
             
@@ -127,30 +214,29 @@ class UnrealBuilderRefactored(Star):
     @filter.command("pack")
     async def pack(self, event: AstrMessageEvent, branch: str, strategy: str, arg3: str = None):
         """通用打包指令 - 兼容原有接口"""
+        yield event.plain_result(await self._pack_impl(branch, strategy, arg3))
+    
+    async def _pack_impl(self, branch: str, strategy: str, arg3: str = None) -> str:
+        """提交打包请求并返回回复消息"""
         try:
-            # 使用新的构建编排器
-            result = await self.build_orchestrator.submit_build_request(
-                branch=branch,
-                strategy=strategy,
-                arg3=arg3
-            )
+            # 交给工作池，由构建编排器处理
+            future = asyncio.get_running_loop().create_future()
+            await self._pack_queue.put((future, branch, strategy, arg3))
+            result = await future
             
-            yield event.plain_result(result['message'])
+            return result['message']
             
         except Exception as e:
-            error_msg = await self.error_handler.handle_error(e, {
-                'command': 'pack',
-                'branch': branch,
-                'strategy': strategy
-            })
-            yield event.plain_result(error_msg)
+            return await self.error_handler.handle_error(
+                e, _error_context('pack', branch=branch, strategy=strategy)
+            )
     
     @filter.command("build_stats")
     async def build_stats(self, event: AstrMessageEvent):
         """查看打包耗时统计 - 兼容原有接口"""
         try:
             # 使用新的统计管理器
-            report = self.stats_manager.generate_statistics_report()
+            report = await self.stats_manager.generate_statistics_report_async()
             
             if isinstance(report, tuple):
                 # 有图表的情况
@@ -164,7 +250,7 @@ class UnrealBuilderRefactored(Star):
                 yield event.plain_result(report)
                 
         except Exception as e:
-            error_msg = await self.error_handler.handle_error(e, {'command': 'build_stats'})
+            error_msg = await self.error_handler.handle_error(e, _error_context('build_stats'))
             yield event.plain_result(error_msg)
     
     @filter.command("build_stop")
@@ -175,14 +261,13 @@ class UnrealBuilderRefactored(Star):
             yield event.plain_result(result['message'])
             
         except Exception as e:
-            error_msg = await self.error_handler.handle_error(e, {'command': 'build_stop'})
+            error_msg = await self.error_handler.handle_error(e, _error_context('build_stop'))
             yield event.plain_result(error_msg)
     
     @filter.command("build_simple")
     async def build_simple(self, event: AstrMessageEvent):
         """兼容旧指令"""
-        async for msg in self.pack(event, "main", "simple"):
-            yield msg
+        yield event.plain_result(await self._pack_impl("main", "simple"))
     
     # ================================================================
     # 新增的高级命令
@@ -192,43 +277,41 @@ class UnrealBuilderRefactored(Star):
     async def build_status(self, event: AstrMessageEvent):
         """获取构建系统状态"""
         try:
-            status = await self.build_orchestrator.get_build_status()
+            status = await self._get_build_status_snapshot()
             
             if 'error' in status:
                 yield event.plain_result(f"❌ 获取状态失败: {status['error']}")
                 return
             
             # 格式化状态信息
-            status_msg = "🔧 **构建系统状态**\n\n"
-            
-            # 当前任务
-            if status['current_task']:
-                task = status['current_task']
-                status_msg += f"🏗️ **当前任务**: [{task['branch']}] {task['strategy']} ({task['status']})\n"
-            else:
-                status_msg += "🏗️ **当前任务**: 无\n"
-            
-            # 队列状态
-            queue = status['queue']
-            status_msg += f"📋 **队列**: {queue['total_size']} 个任务\n"
-            
-            # Web 服务器
+            task = status['current_task']
             web = status['web_server']
-            if web['is_running']:
-                status_msg += f"🌐 **Web服务**: 运行中 (http://{web['host']}:{web['port']})\n"
-            else:
-                status_msg += "🌐 **Web服务**: 已停止\n"
-            
-            # AI 服务
             ai = status['ai_provider']
-            status_msg += f"🤖 **AI服务**: {ai['name']} ({'可用' if ai['available'] else '不可用'})\n"
             
-            yield event.plain_result(status_msg)
+            yield event.plain_result(_STATUS_TEMPLATE.format(
+                task_line=_TASK_RUNNING_TEMPLATE.format_map(task) if task else "无",
+                queue_size=status['queue']['total_size'],
+                web_line=_WEB_RUNNING_TEMPLATE.format_map(web) if web['is_running'] else "已停止",
+                ai_name=ai['name'],
+                ai_available='可用' if ai['available'] else '不可用'
+            ))
             
         except Exception as e:
-            error_msg = await self.error_handler.handle_error(e, {'command': 'build_status'})
+            error_msg = await self.error_handler.handle_error(e, _error_context('build_status'))
             yield event.plain_result(error_msg)
     
+    async def _get_build_status_snapshot(self) -> dict:
+        """获取构建状态，短时间内的重复查询复用同一快照"""
+        async with self._status_lock:
+            cached_at, cached_status = self._status_cache
+            if cached_status is not None and time.monotonic() - cached_at < self.STATUS_CACHE_TTL:
+                return cached_status
+            
+            status = await self.build_orchestrator.get_build_status()
+            if 'error' not in status:
+                self._status_cache = (time.monotonic(), status)
+            return status
+    
     @filter.command("build_queue")
     async def build_queue(self, event: AstrMessageEvent):
         """查看任务队列"""
@@ -239,26 +322,28 @@ class UnrealBuilderRefactored(Star):
                 yield event.plain_result("📋 任务队列为空")
                 return
             
-            msg = f"📋 **任务队列** ({queue_status['total_size']} 个任务)\n\n"
+            parts = [f"📋 **任务队列** ({queue_status['total_size']} 个任务)", ""]
             
             # 按优先级显示
             for priority, count in queue_status['tasks_by_priority'].items():
                 if count > 0:
-                    msg += f"🔸 {priority}: {count} 个任务\n"
+                    parts.append(f"🔸 {priority}: {count} 个任务")
             
             # 按分支显示
-            msg += "\n**按分支分组**:\n"
-            for branch, count in queue_status['tasks_by_branch'].items():
-                msg += f"📂 {branch}: {count} 个任务\n"
+            parts.append("\n**按分支分组**:")
+            parts.extend(
+                f"📂 {branch}: {count} 个任务"
+                for branch, count in queue_status['tasks_by_branch'].items()
+            )
             
             if queue_status['oldest_task_age']:
                 oldest_age = queue_status['oldest_task_age'] / 60  # 转换为分钟
-                msg += f"\n⏰ 最早任务等待时间: {oldest_age:.1f} 分钟"
+                parts.append(f"\n⏰ 最早任务等待时间: {oldest_age:.1f} 分钟")
             
-            yield event.plain_result(msg)
+            yield event.plain_result("\n".join(parts))
             
         except Exception as e:
-            error_msg = await self.error_handler.handle_error(e, {'command': 'build_queue'})
+            error_msg = await self.error_handler.handle_error(e, _error_context('build_queue'))
             yield event.plain_result(error_msg)
     
     @filter.command("build_clear_queue")
@@ -269,26 +354,107 @@ class UnrealBuilderRefactored(Star):
             yield event.plain_result(f"🗑️ 已清空队列，移除了 {cleared_count} 个任务")
             
         except Exception as e:
-            error_msg = await self.error_handler.handle_error(e, {'command': 'build_clear_queue'})
+            error_msg = await self.error_handler.handle_error(e, _error_context('build_clear_queue'))
             yield event.plain_result(error_msg)
     
+    async def _pack_worker(self):
+        """打包请求工作协程 - 从队列中取出请求并提交给构建编排器"""
+        while True:
+            future, branch, strategy, arg3 = await self._pack_queue.get()
+            try:
+                result = await self.build_orchestrator.submit_build_request(
+                    branch=branch,
+                    strategy=strategy,
+                    arg3=arg3
+                )
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                # 工作协程被取消 (插件卸载)，不让等待中的调用方永久挂起
+                self._fail_pack_request(future)
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._pack_queue.task_done()
+    
+    @staticmethod
+    def _fail_pack_request(future: asyncio.Future) -> None:
+        """以卸载错误结束未完成的打包请求"""
+        if not future.done():
+            future.set_exception(TaskQueueError("插件正在卸载，打包请求已取消"))
+    
     # ================================================================
     # 回调处理器
     # ================================================================
     
     async def _on_progress_update(self, progress: ProgressUpdate):
-        """处理进度更新"""
-        self.logger.info(f"Progress: {progress.stage} - {progress.message}")
+        """处理进度更新 - 仅入队，由后台消费者批量记录"""
+        try:
+            self._progress_queue.put_nowait(progress)
+        except asyncio.QueueFull:
+            self.logger.debug("Progress queue full, dropping update: %s", progress.stage)
         # 这里可以添加实时进度通知逻辑
     
+    async def _consume_progress_updates(self):
+        """后台消费进度更新，将同一时间窗口内的更新合并为一条日志"""
+        while True:
+            batch = [await self._progress_queue.get()]
+            
+            # 等待一个批处理窗口，合并期间到达的所有更新
+            await asyncio.sleep(self.PROGRESS_BATCH_WINDOW)
+            while True:
+                try:
+                    batch.append(self._progress_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            if len(batch) == 1:
+                self.logger.info("Progress: %s - %s", batch[0].stage, batch[0].message)
+            else:
+                self.logger.info(
+                    "Progress batch:\n%s", "\n".join(f"{p.stage} - {p.message}" for p in batch)
+                )
+    
     async def _on_build_result(self, result: BuildResult):
         """处理构建结果"""
         # 保存统计数据
         if result.success and result.duration:
             key = f"{result.task.branch}_{result.task.strategy.value}"
-            self.stats_manager.save_build_time(key, result.duration)
+            self._stats_queue.put_nowait((key, result.duration))
         
-        self.logger.info(f"Build completed: {result.task.task_id}, Success: {result.success}")
+        self.logger.info("Build completed: %s, Success: %s", result.task.task_id, result.success)
+    
+    async def _write_build_times(self):
+        """后台批量写入构建耗时，每批次只写一次历史文件 (收到 None 时写完剩余记录并退出)"""
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            entry = await self._stats_queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            
+            # 收集一个刷新周期内到达的记录，直到批次已满
+            deadline = loop.time() + self.STATS_FLUSH_INTERVAL
+            while len(batch) < self.STATS_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._stats_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    closing = True
+                    break
+                batch.append(entry)
+            
+            try:
+                await self.stats_manager.save_build_times_async(batch)
+            except Exception as e:
+                self.logger.error(f"保存构建耗时失败: {e}")
     
     async def _on_executor_progress(self, progress: ProgressUpdate):
         """处理执行器进度更新"""
@@ -318,22 +484,71 @@ class UnrealBuilderRefactored(Star):
     
     def fmt_time(self, seconds: float) -> str:
         """格式化时间 - 兼容原有方法"""
-        return self.stats_manager._format_duration(seconds)
+        return format_duration(int(seconds))
     
     # ================================================================
     # 清理资源
     # ================================================================
     
-    def __del__(self):
-        """清理资源"""
+    async def terminate(self):
+        """插件卸载时由 AstrBot 调用"""
+        await self.aclose()
+    
+    async def aclose(self):
+        """关闭后台任务并清理资源"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self._close_sync)
+        
+        try:
+            # 停止后台任务
+            background_tasks = [self._progress_consumer_task, *self._pack_workers]
+            for task in background_tasks:
+                task.cancel()
+            await asyncio.gather(*background_tasks, return_exceptions=True)
+            
+            # 取消尚未被处理的打包请求，唤醒等待结果的调用方
+            while not self._pack_queue.empty():
+                future, *_ = self._pack_queue.get_nowait()
+                self._fail_pack_request(future)
+                self._pack_queue.task_done()
+            
+            # 写入剩余的统计数据
+            self._stats_queue.put_nowait(None)
+            await self._stats_writer_task
+            
+            # 停止 Web 服务器
+            await self.web_server.stop()
+        
+        except Exception as e:
+            self.logger.error(f"关闭插件失败: {e}")
+        
+        try:
+            # 停止配置热重载
+            self.config_manager.stop_hot_reload()
+            
+            # 在线程池中清理临时文件，避免阻塞事件循环
+            await asyncio.to_thread(self.file_manager.cleanup_temp_files)
+            self.file_manager.shutdown()
+            
+        except Exception as e:
+            self.logger.warning(f"清理资源失败: {e}")
+        
+        # 停止后台日志线程 (剩余日志在此写出)
+        self.logger.close()
+    
+    def _close_sync(self):
+        """同步清理资源 (同时作为进程退出时的兜底)"""
         try:
             # 停止配置热重载
-            if hasattr(self, 'config_manager'):
-                self.config_manager.stop_hot_reload()
+            self.config_manager.stop_hot_reload()
             
             # 清理临时文件
-            if hasattr(self, 'file_manager'):
-                self.file_manager.cleanup_temp_files()
-                
-        except Exception:
-            pass  # 忽略清理时的错误
\ No newline at end of file
+            self.file_manager.cleanup_temp_files()
+            self.file_manager.shutdown()
+            
+        except Exception as e:
+            self.logger.warning(f"清理资源失败: {e}")
+        
+        self.logger.close()
@@ -3,8 +3,10 @@ Build orchestrator - coordinates all build-related operations.
 """
 
 import asyncio
-from typing import Optional, Dict, Any, Callable, Awaitable, List
-from datetime import datetime
+import inspect
+import time
+import weakref
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Tuple
 
 from src.domain.interfaces.base import ILogger
 from src.domain.interfaces.file_manager import IFileManager
@@ -16,12 +18,27 @@ from src.domain.models.entities import (
     BuildInfo, ProgressUpdate
 )
 from src.domain.models.configuration import BuildConfiguration, ScriptConfiguration
+from src.domain.formatting import format_duration
 from src.domain.exceptions import BuildExecutionError, ValidationError
 
 
+_SUCCESS_TMPL = (
+    "🎉 [{branch}] 打包成功！\n"
+    "⏱️ 耗时: {duration}\n"
+    "🔢 版本: {version} ({build_type})\n"
+    "💾 大小: {size}\n"
+    "🌐 下载: {url}\n"
+    "📂 路径: {path}"
+)
+_FAILURE_TMPL = "⚠️ [{branch}] 打包失败"
+
+
 class BuildOrchestrator:
     """Orchestrates build operations with separation of pure functions and side effects."""
     
+    # Progress updates arriving within this window are delivered together
+    PROGRESS_COALESCE_WINDOW = 0.05
+    
     def __init__(
         self,
         config: BuildConfiguration,
@@ -42,13 +59,19 @@ class BuildOrchestrator:
         self.ai_provider = ai_provider
         self.logger = logger
         
-        # State management
-        self._is_processing = False
+        # State management - a single dispatcher drains the queue
         self._current_task: Optional[BuildTask] = None
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self._submit_lock = asyncio.Lock()
+        
+        # Callbacks, held as references so bound-method listeners can be collected
+        self._progress_callbacks: List[Callable[[], Optional[Callable[[ProgressUpdate], Awaitable[None]]]]] = []
+        self._result_callbacks: List[Callable[[], Optional[Callable[[BuildResult], Awaitable[None]]]]] = []
         
-        # Callbacks
-        self._progress_callbacks: List[Callable[[ProgressUpdate], Awaitable[None]]] = []
-        self._result_callbacks: List[Callable[[BuildResult], Awaitable[None]]] = []
+        # Progress coalescing - latest update per (task_id, stage) until the next flush
+        self._pending_progress: Dict[Tuple[str, str], ProgressUpdate] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
     
     async def submit_build_request(
         self, 
@@ -60,34 +83,33 @@ class BuildOrchestrator:
         """Submit build request and return status information."""
         try:
             # Validate inputs (pure function)
-            validation_result = self._validate_build_request(branch, strategy, arg3)
-            if not validation_result['valid']:
-                raise ValidationError(validation_result['error'])
+            strategy_enum, branch_clean = self._validate_build_request(branch, strategy, arg3)
             
-            # Create build task (pure function)
-            task = self._create_build_task(branch, strategy, arg3)
+            # Create build task (pure function), reusing the parsed strategy
+            task = self._create_build_task(branch_clean, strategy_enum, arg3)
             
             # Set up paths (side effect)
-            bat_dir, publish_root = self.file_manager.get_branch_paths(branch)
+            bat_dir, publish_root = self.file_manager.get_branch_paths(branch_clean)
             task.bat_dir = bat_dir
             task.publish_root = publish_root
             
-            # Check if already processing
-            if self._is_processing:
-                # Add to queue
+            # Every task goes through the queue; the check and the dispatcher
+            # start happen under one lock so concurrent submits cannot race
+            async with self._submit_lock:
+                was_busy = self._is_dispatching()
                 await self.task_queue.enqueue(task, priority)
                 position = await self.task_queue.get_task_position(task.task_id)
+                self._ensure_dispatcher()
                 
-                return {
-                    'status': 'queued',
-                    'task_id': task.task_id,
-                    'position': position,
-                    'message': f"⏳ 当前有任务运行中。您的任务 [{branch}-{strategy}] 已加入队列 (排在第 {position} 位)"
-                }
-            else:
-                # Start processing immediately
-                self._is_processing = True
-                asyncio.create_task(self._process_build_task(task))
+                # Restored or higher-priority tasks may be ahead even when idle
+                if was_busy or position != 1:
+                    reason = "当前有任务运行中" if was_busy else "队列中有更早或更高优先级的任务"
+                    return {
+                        'status': 'queued',
+                        'task_id': task.task_id,
+                        'position': position,
+                        'message': f"⏳ {reason}。您的任务 [{branch}-{strategy}] 已加入队列 (排在第 {position} 位)"
+                    }
                 
                 return {
                     'status': 'started',
@@ -99,6 +121,18 @@ class BuildOrchestrator:
             self.logger.error(f"Failed to submit build request: {e}")
             raise
     
+    async def resume_queued_tasks(self) -> int:
+        """Start draining tasks already in the queue (e.g. restored from disk).
+        
+        Returns the number of queued tasks found.
+        """
+        async with self._submit_lock:
+            queue_size = await self.task_queue.get_queue_size()
+            if queue_size:
+                self.logger.info(f"Resuming {queue_size} queued tasks")
+                self._ensure_dispatcher()
+            return queue_size
+    
     async def cancel_build(self, task_id: Optional[str] = None) -> Dict[str, Any]:
         """Cancel build task."""
         try:
@@ -131,7 +165,7 @@ class BuildOrchestrator:
             current_task = self.task_executor.get_current_task()
             
             return {
-                'is_processing': self._is_processing,
+                'is_processing': self._is_dispatching(),
                 'current_task': {
                     'task_id': current_task.task_id if current_task else None,
                     'branch': current_task.branch if current_task else None,
@@ -149,39 +183,40 @@ class BuildOrchestrator:
     
     def add_progress_callback(self, callback: Callable[[ProgressUpdate], Awaitable[None]]) -> None:
         """Add progress update callback."""
-        self._progress_callbacks.append(callback)
+        self._progress_callbacks.append(self._make_callback_ref(callback))
     
     def add_result_callback(self, callback: Callable[[BuildResult], Awaitable[None]]) -> None:
         """Add build result callback."""
-        self._result_callbacks.append(callback)
+        self._result_callbacks.append(self._make_callback_ref(callback))
     
     # Pure functions (no side effects)
     
-    def _validate_build_request(self, branch: str, strategy: str, arg3: Optional[str]) -> Dict[str, Any]:
-        """Validate build request parameters (pure function)."""
+    def _validate_build_request(self, branch: str, strategy: str, arg3: Optional[str]) -> Tuple[BuildStrategy, str]:
+        """Validate build request parameters (pure function).
+        
+        Returns the parsed strategy and the stripped branch name, or raises ValidationError.
+        """
+        # Validate strategy
         try:
-            # Validate strategy
             build_strategy = BuildStrategy.from_string(strategy)
-            
-            # Validate branch
-            if not branch or not isinstance(branch, str) or not branch.strip():
-                return {'valid': False, 'error': 'Branch must be a non-empty string'}
-            
-            # Validate arg3 for special strategy
-            if build_strategy == BuildStrategy.SPECIAL and not arg3:
-                return {'valid': False, 'error': 'arg3 is required for SPECIAL build strategy'}
-            
-            return {'valid': True, 'strategy': build_strategy}
-            
         except ValueError as e:
-            return {'valid': False, 'error': str(e)}
+            raise ValidationError(str(e), field='strategy', value=strategy) from None
+        
+        # Validate branch
+        if not (isinstance(branch, str) and branch and not branch.isspace()):
+            raise ValidationError('Branch must be a non-empty string', field='branch', value=branch)
+        
+        # Validate arg3 for special strategy
+        if build_strategy == BuildStrategy.SPECIAL and not arg3:
+            raise ValidationError('arg3 is required for SPECIAL build strategy', field='arg3', value=arg3)
+        
+        return build_strategy, branch.strip()
     
-    def _create_build_task(self, branch: str, strategy: str, arg3: Optional[str]) -> BuildTask:
-        """Create build task from parameters (pure function)."""
-        build_strategy = BuildStrategy.from_string(strategy)
+    def _create_build_task(self, branch: str, strategy: BuildStrategy, arg3: Optional[str]) -> BuildTask:
+        """Create build task from validated parameters (pure function)."""
         return BuildTask(
-            branch=branch.strip(),
-            strategy=build_strategy,
+            branch=branch,
+            strategy=strategy,
             arg3=arg3
         )
     
@@ -210,30 +245,17 @@ class BuildOrchestrator:
     def _format_build_messages(self, task: BuildTask, build_info: Optional[BuildInfo], duration: float) -> Dict[str, str]:
         """Format build result messages (pure function)."""
         if build_info:
-            download_url = self.web_server.get_download_url(build_info.path)
-            
-            success_message = (
-                f"🎉 [{task.branch}] 打包成功！\n"
-                f"⏱️ 耗时: {self._format_duration(duration)}\n"
-                f"🔢 版本: {build_info.version} ({build_info.build_type.value})\n"
-                f"💾 大小: {build_info.size_str}\n"
-                f"🌐 下载: {download_url}\n"
-                f"📂 路径: {build_info.path}"
-            )
-            
-            return {'success': success_message}
+            return {'success': _SUCCESS_TMPL.format_map({
+                'branch': task.branch,
+                'duration': format_duration(int(duration)),
+                'version': build_info.version,
+                'build_type': build_info.build_type.value,
+                'size': build_info.size_str,
+                'url': self.web_server.get_download_url(build_info.path),
+                'path': build_info.path,
+            })}
         else:
-            return {'failure': f"⚠️ [{task.branch}] 打包失败"}
-    
-    def _format_duration(self, seconds: float) -> str:
-        """Format duration in human-readable format (pure function)."""
-        minutes, secs = divmod(int(seconds), 60)
-        hours, minutes = divmod(minutes, 60)
-        
-        if hours > 0:
-            return f"{hours}h {minutes}m {secs}s"
-        else:
-            return f"{minutes}m {secs}s"
+            return {'failure': _FAILURE_TMPL.format(branch=task.branch)}
     
     # Side effect functions
     
@@ -249,7 +271,8 @@ class BuildOrchestrator:
                 message="🔍 执行预检查..."
             ))
             
-            disk_warning = self.file_manager.check_disk_space()
+            # Probed when the build starts, so queued tasks see current free space
+            disk_warning = await asyncio.to_thread(self.file_manager.check_disk_space)
             if disk_warning:
                 await self._notify_progress(ProgressUpdate(
                     task_id=task.task_id,
@@ -258,9 +281,9 @@ class BuildOrchestrator:
                 ))
             
             # Execute build
-            start_time = datetime.now()
+            start_perf = time.perf_counter()
             await self.task_executor.execute_task(task)
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_perf
             
             # Process results
             build_result = await self._process_build_results(task, duration)
@@ -282,16 +305,13 @@ class BuildOrchestrator:
         
         finally:
             self._current_task = None
-            
-            # Process next task in queue
-            await self._process_next_task()
     
     async def _process_build_results(self, task: BuildTask, duration: float) -> BuildResult:
         """Process build results and generate AI analysis if needed."""
         # Get build artifacts
-        found_build, build_info, build_path = self.file_manager.get_latest_build_info(
+        found_build, build_info, build_path = await self.file_manager.get_latest_build_info_async(
             task.publish_root,
-            after_timestamp=task.started_at.timestamp() if task.started_at else None
+            after_timestamp=task.started_at
         )
         
         # Determine success
@@ -333,23 +353,21 @@ class BuildOrchestrator:
     async def _generate_failure_analysis(self, task: BuildTask, build_path: Optional[str]) -> Optional[str]:
         """Generate AI-powered failure analysis."""
         try:
-            # Get log content
-            log_content = ""
+            # Stream the log file straight into the provider when there is one
             if build_path:
                 log_file = self.file_manager.find_disk_log(build_path)
                 if log_file:
                     try:
-                        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            log_content = f.read()
-                    except Exception:
+                        response = await self.ai_provider.analyze_failure_from_path(
+                            log_file, max_bytes=self.config.ai_log_tail_bytes
+                        )
+                        return response.completion_text if response.success else None
+                    except OSError:
                         pass
             
-            if not log_content and task.error_message:
-                log_content = task.error_message
-            
             # Generate AI analysis
-            if log_content:
-                response = await self.ai_provider.analyze_failure(log_content)
+            if task.error_message:
+                response = await self.ai_provider.analyze_failure(task.error_message)
                 return response.completion_text if response.success else None
             
             return None
@@ -358,33 +376,100 @@ class BuildOrchestrator:
             self.logger.warning(f"Failed to generate failure analysis: {e}")
             return None
     
-    async def _process_next_task(self) -> None:
-        """Process next task in queue."""
+    def _is_dispatching(self) -> bool:
+        """Check whether the dispatcher is currently draining the queue."""
+        return self._dispatcher_task is not None and not self._dispatcher_task.done()
+    
+    def _ensure_dispatcher(self) -> None:
+        """Start the dispatcher if it is not already running."""
+        if not self._is_dispatching():
+            self._dispatcher_task = asyncio.create_task(self._dispatch_loop())
+    
+    async def _dispatch_loop(self) -> None:
+        """Process queued tasks one at a time until the queue is empty."""
         try:
-            next_task = await self.task_queue.dequeue()
-            if next_task:
-                # Continue processing
-                asyncio.create_task(self._process_build_task(next_task))
-            else:
-                # No more tasks
-                self._is_processing = False
+            while (task := await self.task_queue.dequeue()) is not None:
+                await self._process_build_task(task)
                 
         except Exception as e:
             self.logger.error(f"Failed to process next task: {e}")
-            self._is_processing = False
+    
+    @staticmethod
+    def _make_callback_ref(callback: Callable) -> Callable[[], Optional[Callable]]:
+        """Wrap a callback so bound methods are held weakly.
+        
+        Plain functions, lambdas and closures are often the only reference to
+        themselves, so they are kept strongly.
+        """
+        if inspect.ismethod(callback):
+            return weakref.WeakMethod(callback)
+        return lambda: callback
+    
+    @staticmethod
+    def _resolve_callbacks(refs: List[Callable[[], Optional[Callable]]]) -> List[Callable]:
+        """Resolve live callbacks and prune dead references in place."""
+        callbacks = [ref() for ref in refs]
+        if None in callbacks:
+            refs[:] = [ref for ref, callback in zip(refs, callbacks) if callback is not None]
+            callbacks = [callback for callback in callbacks if callback is not None]
+        return callbacks
     
     async def _notify_progress(self, progress: ProgressUpdate) -> None:
-        """Notify progress callbacks."""
-        for callback in self._progress_callbacks:
-            try:
-                await callback(progress)
-            except Exception as e:
-                self.logger.warning(f"Progress callback failed: {e}")
+        """Buffer a progress update and schedule a coalesced flush.
+        
+        A newer update for the same task and stage replaces a pending one.
+        """
+        key = (progress.task_id, progress.stage)
+        self._pending_progress.pop(key, None)
+        self._pending_progress[key] = progress
+        
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.PROGRESS_COALESCE_WINDOW, self._schedule_progress_flush
+            )
+    
+    def _schedule_progress_flush(self) -> None:
+        """Timer callback that starts flushing buffered progress updates."""
+        self._flush_handle = None
+        self._flush_task = asyncio.create_task(self.flush_progress_now())
+    
+    async def flush_progress_now(self) -> None:
+        """Deliver all buffered progress updates immediately, in arrival order."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        pending, self._pending_progress = self._pending_progress, {}
+        for progress in pending.values():
+            await self._dispatch_progress(progress)
+    
+    async def _dispatch_progress(self, progress: ProgressUpdate) -> None:
+        """Notify progress callbacks concurrently."""
+        callbacks = self._resolve_callbacks(self._progress_callbacks)
+        if not callbacks:
+            return
+        
+        results = await asyncio.gather(
+            *(callback(progress) for callback in callbacks),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.warning(f"Progress callback failed: {result}")
     
     async def _notify_result(self, result: BuildResult) -> None:
-        """Notify result callbacks."""
-        for callback in self._result_callbacks:
-            try:
-                await callback(result)
-            except Exception as e:
-                self.logger.warning(f"Result callback failed: {e}")
\ No newline at end of file
+        """Notify result callbacks concurrently."""
+        # Progress for this build must reach listeners before its final result
+        await self.flush_progress_now()
+        
+        callbacks = self._resolve_callbacks(self._result_callbacks)
+        if not callbacks:
+            return
+        
+        outcomes = await asyncio.gather(
+            *(callback(result) for callback in callbacks),
+            return_exceptions=True
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                self.logger.warning(f"Result callback failed: {outcome}")
@@ -2,24 +2,52 @@
 Statistics manager for build history and performance tracking.
 """
 
+import asyncio
+import functools
 import json
 import os
-from typing import Dict, List, Optional, Tuple, Union
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 import io
+import threading
 
 from src.domain.interfaces.base import ILogger
 from src.domain.models.configuration import BuildConfiguration
+from src.domain.formatting import format_duration
 from src.domain.exceptions import FileSystemError
 
-# Optional matplotlib import
+# Optional orjson import (faster history serialization)
 try:
-    import matplotlib.pyplot as plt
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional numpy import (vectorized statistics)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Optional matplotlib import (Figure API renders through Agg without pyplot's GUI state)
+try:
+    from matplotlib.figure import Figure
     HAS_MATPLOTLIB = True
 except ImportError:
     HAS_MATPLOTLIB = False
 
 
+def _with_history_lock(method):
+    """Serialize access to the cached history across worker threads."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._history_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class StatisticsManager:
     """Manages build statistics and history tracking."""
     
@@ -28,33 +56,62 @@ class StatisticsManager:
         self.logger = logger
         self.history_file = Path(config.history_file)
         
+        # In-memory history cache, invalidated when the file's mtime changes
+        self._history_cache: Optional[Dict[str, Deque[float]]] = None
+        self._history_mtime: int = 0
+        
+        # Per-key aggregates (count/sum/min/max/trend), recomputed only when a key changes
+        self._aggregates: Dict[str, Dict[str, Any]] = {}
+        self._history_lock = threading.RLock()
+        
+        # Chart figure, created on first use and reused between renders
+        self._chart_figure: Optional['Figure'] = None
+        self._chart_axes = None
+        self._chart_lock = threading.Lock()
+        
         # Ensure history file directory exists
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
     
     def save_build_time(self, key: str, duration: float) -> None:
         """Record build time for statistics."""
+        self.save_build_times([(key, duration)])
+    
+    @_with_history_lock
+    def save_build_times(self, entries: List[Tuple[str, float]]) -> None:
+        """Record a batch of build times with a single history write."""
+        if not entries:
+            return
+        
         try:
             # Load existing history
             history = self._load_history()
             
-            # Add new entry
-            if key not in history:
-                history[key] = []
-            
-            history[key].append(duration)
-            
-            # Keep only recent entries
-            history[key] = history[key][-self.config.max_history_entries:]
+            # Add new entries (bounded deques drop the oldest entries automatically)
+            for key, duration in entries:
+                if key not in history:
+                    history[key] = deque(maxlen=self.config.max_history_entries)
+                history[key].append(duration)
+                self._aggregates.pop(key, None)
             
             # Save updated history
             self._save_history(history)
             
-            self.logger.info(f"Build time recorded: {key} = {duration:.1f}s")
+            for key, duration in entries:
+                self.logger.info(f"Build time recorded: {key} = {duration:.1f}s")
             
         except Exception as e:
             self.logger.error(f"Failed to save build time: {e}")
             raise FileSystemError(f"Failed to save build time: {e}")
     
+    async def save_build_time_async(self, key: str, duration: float) -> None:
+        """Record build time without blocking the event loop."""
+        await asyncio.to_thread(self.save_build_time, key, duration)
+    
+    async def save_build_times_async(self, entries: List[Tuple[str, float]]) -> None:
+        """Record a batch of build times without blocking the event loop."""
+        await asyncio.to_thread(self.save_build_times, entries)
+    
+    @_with_history_lock
     def get_estimated_time(self, key: str) -> str:
         """Get estimated build time for a key."""
         try:
@@ -63,15 +120,15 @@ class StatisticsManager:
             if key not in history or not history[key]:
                 return "❓"
             
-            times = history[key]
-            average_time = sum(times) / len(times)
+            aggregates = self._get_aggregates(key, history[key])
             
-            return self._format_duration(average_time)
+            return self._format_duration(aggregates['average'])
             
         except Exception as e:
             self.logger.warning(f"Failed to get estimated time: {e}")
             return "❓"
     
+    @_with_history_lock
     def get_build_statistics(self) -> Dict[str, any]:
         """Get comprehensive build statistics."""
         try:
@@ -86,13 +143,14 @@ class StatisticsManager:
                 if not times:
                     continue
                 
+                aggregates = self._get_aggregates(key, times)
                 stats[key] = {
-                    'count': len(times),
-                    'average': sum(times) / len(times),
-                    'min': min(times),
-                    'max': max(times),
-                    'latest': times[-1],
-                    'trend': self._calculate_trend(times)
+                    'count': aggregates['count'],
+                    'average': aggregates['average'],
+                    'min': aggregates['min'],
+                    'max': aggregates['max'],
+                    'latest': aggregates['latest'],
+                    'trend': aggregates['trend']
                 }
             
             return stats
@@ -101,6 +159,7 @@ class StatisticsManager:
             self.logger.error(f"Failed to get build statistics: {e}")
             return {'error': str(e)}
     
+    @_with_history_lock
     def generate_statistics_report(self) -> Union[str, Tuple[str, str]]:
         """Generate statistics report, with optional chart."""
         try:
@@ -122,6 +181,11 @@ class StatisticsManager:
             self.logger.error(f"Failed to generate statistics report: {e}")
             return f"❌ 统计报告生成失败: {e}"
     
+    async def generate_statistics_report_async(self) -> Union[str, Tuple[str, str]]:
+        """Generate statistics report (and chart) in a worker thread."""
+        return await asyncio.to_thread(self.generate_statistics_report)
+    
+    @_with_history_lock
     def clear_statistics(self, key: Optional[str] = None) -> Dict[str, any]:
         """Clear statistics for a specific key or all keys."""
         try:
@@ -130,12 +194,14 @@ class StatisticsManager:
             if key:
                 if key in history:
                     del history[key]
+                    self._aggregates.pop(key, None)
                     self._save_history(history)
                     return {'status': 'success', 'message': f'已清除 {key} 的统计数据'}
                 else:
                     return {'status': 'not_found', 'message': f'未找到 {key} 的统计数据'}
             else:
                 # Clear all
+                self._aggregates.clear()
                 self._save_history({})
                 return {'status': 'success', 'message': '已清除所有统计数据'}
                 
@@ -143,47 +209,112 @@ class StatisticsManager:
             self.logger.error(f"Failed to clear statistics: {e}")
             return {'status': 'error', 'message': f'清除失败: {e}'}
     
-    def _load_history(self) -> Dict[str, List[float]]:
-        """Load build history from file."""
-        if not self.history_file.exists():
+    def _load_history(self) -> Dict[str, Deque[float]]:
+        """Load build history, re-reading the file only when it has changed."""
+        try:
+            mtime = self.history_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._history_cache = None
+            self._history_mtime = 0
+            self._aggregates.clear()
             return {}
         
+        if self._history_cache is not None and mtime == self._history_mtime:
+            return self._history_cache
+        
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            with open(self.history_file, 'rb') as f:
+                data = f.read()
+            raw_history = orjson.loads(data) if HAS_ORJSON else json.loads(data)
+            self._history_cache = {
+                key: deque(times, maxlen=self.config.max_history_entries)
+                for key, times in raw_history.items()
+            }
+            self._history_mtime = mtime
+            self._aggregates.clear()
+            return self._history_cache
+        except (ValueError, IOError) as e:
             self.logger.warning(f"Failed to load history file: {e}")
             return {}
     
-    def _save_history(self, history: Dict[str, List[float]]) -> None:
-        """Save build history to file."""
+    def _save_history(self, history: Dict[str, Deque[float]]) -> None:
+        """Save build history to file atomically and refresh the cache."""
+        temp_file = self.history_file.with_name(self.history_file.name + '.tmp')
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=4)
-        except IOError as e:
+            if HAS_ORJSON:
+                data = orjson.dumps(history, default=list)
+            else:
+                data = json.dumps(history, separators=(',', ':'), default=list).encode('utf-8')
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+            os.replace(temp_file, self.history_file)
+            
+            self._history_cache = history
+            self._history_mtime = self.history_file.stat().st_mtime_ns
+        except (IOError, OSError) as e:
+            self._history_cache = None
+            self._aggregates.clear()
             self.logger.error(f"Failed to save history file: {e}")
             raise FileSystemError(f"Failed to save history: {e}")
     
     def _format_duration(self, seconds: float) -> str:
         """Format duration in human-readable format."""
-        minutes, secs = divmod(int(seconds), 60)
-        hours, minutes = divmod(minutes, 60)
+        return format_duration(int(seconds))
+    
+    def _get_aggregates(self, key: str, times: Sequence[float]) -> Dict[str, Any]:
+        """Get cached aggregates for a build key, computing them on first use."""
+        aggregates = self._aggregates.get(key)
+        if aggregates is None:
+            aggregates = self._compute_aggregates(times)
+            self._aggregates[key] = aggregates
+        return aggregates
+    
+    def _compute_aggregates(self, times: Sequence[float]) -> Dict[str, Any]:
+        """Compute count/average/min/max/trend for build times in a single pass."""
+        count = len(times)
+        mid_point = count // 2
         
-        if hours > 0:
-            return f"{hours}h {minutes}m {secs}s"
+        if HAS_NUMPY:
+            values = np.asarray(times, dtype=np.float64)
+            total = float(values.sum())
+            older_total = float(values[:mid_point].sum())
+            min_time = float(values.min())
+            max_time = float(values.max())
         else:
-            return f"{minutes}m {secs}s"
+            total = older_total = 0.0
+            min_time = max_time = times[0]
+            
+            for index, duration in enumerate(times):
+                total += duration
+                if index < mid_point:
+                    older_total += duration
+                if duration < min_time:
+                    min_time = duration
+                elif duration > max_time:
+                    max_time = duration
+        
+        if count < 2:
+            trend = "stable"
+        else:
+            trend = self._classify_trend(
+                older_total / mid_point,
+                (total - older_total) / (count - mid_point)
+            )
+        
+        return {
+            'count': count,
+            'average': total / count,
+            'min': min_time,
+            'max': max_time,
+            'latest': times[-1],
+            'trend': trend
+        }
     
-    def _calculate_trend(self, times: List[float]) -> str:
-        """Calculate trend for build times."""
-        if len(times) < 2:
+    def _classify_trend(self, older_avg: float, recent_avg: float) -> str:
+        """Classify the change between older and recent average build times."""
+        if older_avg <= 0:
             return "stable"
         
-        # Compare recent half with older half
-        mid_point = len(times) // 2
-        older_avg = sum(times[:mid_point]) / mid_point
-        recent_avg = sum(times[mid_point:]) / (len(times) - mid_point)
-        
         change_percent = ((recent_avg - older_avg) / older_avg) * 100
         
         if change_percent > 10:
@@ -193,7 +324,7 @@ class StatisticsManager:
         else:
             return "stable"
     
-    def _generate_text_report(self, history: Dict[str, List[float]]) -> str:
+    def _generate_text_report(self, history: Dict[str, Deque[float]]) -> str:
         """Generate text-based statistics report."""
         report_lines = ["📊 **打包耗时统计**\n"]
         
@@ -201,10 +332,11 @@ class StatisticsManager:
             if not times:
                 continue
             
-            avg_time = sum(times) / len(times)
-            min_time = min(times)
-            max_time = max(times)
-            trend = self._calculate_trend(times)
+            aggregates = self._get_aggregates(key, times)
+            avg_time = aggregates['average']
+            min_time = aggregates['min']
+            max_time = aggregates['max']
+            trend = aggregates['trend']
             
             trend_emoji = {
                 'increasing': '📈',
@@ -221,27 +353,32 @@ class StatisticsManager:
         
         return "\n".join(report_lines)
     
-    def _generate_chart(self, history: Dict[str, List[float]]) -> str:
+    def _generate_chart(self, history: Dict[str, Deque[float]]) -> str:
         """Generate statistics chart and return image path."""
         try:
-            plt.figure(figsize=(12, 8))
-            
-            # Plot trends for each build type
-            for key, times in history.items():
-                if len(times) > 1:  # Need at least 2 points for a line
-                    plt.plot(range(len(times)), times, marker='o', label=key, linewidth=2)
-            
-            plt.title("Build Time Trends", fontsize=16, fontweight='bold')
-            plt.xlabel("Build Number (Recent Builds)", fontsize=12)
-            plt.ylabel("Duration (seconds)", fontsize=12)
-            plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            # Save chart
-            chart_path = self.history_file.parent / "build_stats_chart.png"
-            plt.savefig(chart_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            with self._chart_lock:
+                if self._chart_figure is None:
+                    self._chart_figure = Figure(figsize=(12, 8))
+                    self._chart_axes = self._chart_figure.add_subplot()
+                
+                ax = self._chart_axes
+                ax.clear()
+                
+                # Plot trends for each build type
+                for key, times in history.items():
+                    if len(times) > 1:  # Need at least 2 points for a line
+                        ax.plot(range(len(times)), times, marker='o', label=key, linewidth=2)
+                
+                ax.set_title("Build Time Trends", fontsize=16, fontweight='bold')
+                ax.set_xlabel("Build Number (Recent Builds)", fontsize=12)
+                ax.set_ylabel("Duration (seconds)", fontsize=12)
+                ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+                ax.grid(True, alpha=0.3)
+                self._chart_figure.tight_layout()
+                
+                # Save chart
+                chart_path = self.history_file.parent / "build_stats_chart.png"
+                self._chart_figure.savefig(chart_path, dpi=150, bbox_inches='tight')
             
             self.logger.info(f"Statistics chart generated: {chart_path}")
             return str(chart_path)
@@ -250,22 +387,25 @@ class StatisticsManager:
             self.logger.error(f"Failed to generate chart: {e}")
             raise FileSystemError(f"Failed to generate chart: {e}")
     
+    @_with_history_lock
     def export_statistics(self, export_path: str) -> Dict[str, any]:
         """Export statistics to external file."""
         try:
             history = self._load_history()
             stats = self.get_build_statistics()
+            averages = [
+                self._get_aggregates(key, times)['average']
+                for key, times in history.items() if times
+            ]
             
             export_data = {
                 'export_timestamp': str(Path().cwd()),
-                'raw_history': history,
+                'raw_history': {key: list(times) for key, times in history.items()},
                 'statistics': stats,
                 'summary': {
                     'total_builds': sum(len(times) for times in history.values()),
                     'build_types': len(history),
-                    'average_duration': sum(
-                        sum(times) / len(times) for times in history.values() if times
-                    ) / len([times for times in history.values() if times]) if history else 0
+                    'average_duration': sum(averages) / len(averages) if averages else 0
                 }
             }
             
@@ -2,32 +2,55 @@
 Domain exceptions and error hierarchy.
 """
 
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
+
+
+_EMPTY_CONTEXT: Mapping[str, Any] = MappingProxyType({})
 
 
 class BuildSystemError(Exception):
     """Base exception for build system errors."""
     
+    __slots__ = ("message", "_context")
+    
     def __init__(self, message: str, context: Optional[Dict[str, Any]] = None):
         super().__init__(message)
         self.message = message
-        self.context = context or {}
+        self._context = context
+    
+    @property
+    def context(self) -> Mapping[str, Any]:
+        """Error context, or a shared read-only empty mapping when none was given."""
+        return self._context or _EMPTY_CONTEXT
     
     def __str__(self) -> str:
-        if self.context:
-            context_str = ", ".join(f"{k}={v}" for k, v in self.context.items())
-            return f"{self.message} (Context: {context_str})"
-        return self.message
+        if not self._context:
+            return self.message
+        context_str = ", ".join(f"{k}={v}" for k, v in self._context.items())
+        return f"{self.message} (Context: {context_str})"
+    
+    def __reduce__(self):
+        # Slot values are not part of __dict__, so hand them to __setstate__ explicitly
+        state = dict(getattr(self, '__dict__', None) or {})
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return type(self), self.args, state
 
 
 class ConfigurationError(BuildSystemError):
     """Configuration related errors."""
-    pass
+    
+    __slots__ = ()
 
 
 class BuildExecutionError(BuildSystemError):
     """Build execution related errors."""
     
+    __slots__ = ("return_code", "log_content")
+    
     def __init__(self, message: str, return_code: Optional[int] = None, 
                  log_content: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
         super().__init__(message, context)
@@ -38,6 +61,8 @@ class BuildExecutionError(BuildSystemError):
 class FileSystemError(BuildSystemError):
     """File system operation errors."""
     
+    __slots__ = ("file_path",)
+    
     def __init__(self, message: str, file_path: Optional[str] = None, 
                  context: Optional[Dict[str, Any]] = None):
         super().__init__(message, context)
@@ -47,6 +72,8 @@ class FileSystemError(BuildSystemError):
 class NetworkError(BuildSystemError):
     """Network operation errors."""
     
+    __slots__ = ("port", "host")
+    
     def __init__(self, message: str, port: Optional[int] = None, 
                  host: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
         super().__init__(message, context)
@@ -56,12 +83,15 @@ class NetworkError(BuildSystemError):
 
 class TaskQueueError(BuildSystemError):
     """Task queue operation errors."""
-    pass
+    
+    __slots__ = ()
 
 
 class AIServiceError(BuildSystemError):
     """AI service integration errors."""
     
+    __slots__ = ("provider",)
+    
     def __init__(self, message: str, provider: Optional[str] = None, 
                  context: Optional[Dict[str, Any]] = None):
         super().__init__(message, context)
@@ -71,6 +101,8 @@ class AIServiceError(BuildSystemError):
 class ValidationError(BuildSystemError):
     """Data validation errors."""
     
+    __slots__ = ("field", "value")
+    
     def __init__(self, message: str, field: Optional[str] = None, 
                  value: Optional[Any] = None, context: Optional[Dict[str, Any]] = None):
         super().__init__(message, context)
@@ -80,12 +112,15 @@ class ValidationError(BuildSystemError):
 
 class SecurityError(BuildSystemError):
     """Security related errors (e.g., path traversal)."""
-    pass
+    
+    __slots__ = ()
 
 
 class ProcessError(BuildSystemError):
     """Process execution errors."""
     
+    __slots__ = ("process_id", "command")
+    
     def __init__(self, message: str, process_id: Optional[int] = None, 
                  command: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
         super().__init__(message, context)
@@ -0,0 +1,17 @@
+"""
+Shared pure formatting helpers.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=2048)
+def format_duration(seconds: int) -> str:
+    """Format whole seconds in human-readable format (pure function)."""
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    
+    if hours > 0:
+        return f"{hours}h {minutes}m {secs}s"
+    else:
+        return f"{minutes}m {secs}s"
@@ -2,8 +2,7 @@
 AI provider interface definitions.
 """
 
-from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Protocol, Union
 from dataclasses import dataclass
 
 
@@ -26,46 +25,46 @@ class AIResponse:
     tokens_used: Optional[int] = None
     response_time: Optional[float] = None
     provider: Optional[str] = None
+    cached: bool = False
 
 
-class IAIProvider(ABC):
+class IAIProvider(Protocol):
     """Interface for AI service providers."""
     
-    @abstractmethod
     async def text_chat(self, prompt: str, session_id: Optional[str] = None, **kwargs) -> AIResponse:
         """Send text chat request to AI provider."""
-        pass
+        ...
     
-    @abstractmethod
-    async def analyze_failure(self, log_content: str, context: Optional[Dict[str, Any]] = None) -> AIResponse:
+    async def analyze_failure(self, log_content: Union[str, bytes],
+                              context: Optional[Dict[str, Any]] = None) -> AIResponse:
         """Analyze build failure logs and provide suggestions."""
-        pass
+        ...
+    
+    async def analyze_failure_from_path(self, log_path: str, context: Optional[Dict[str, Any]] = None,
+                                        max_bytes: Optional[int] = None) -> AIResponse:
+        """Analyze a build failure log file, reading at most its last max_bytes."""
+        ...
     
-    @abstractmethod
     async def generate_changelog(self, changes_text: str, context: Optional[Dict[str, Any]] = None) -> AIResponse:
         """Generate user-friendly changelog from technical changes."""
-        pass
+        ...
     
-    @abstractmethod
     def get_provider_info(self) -> Dict[str, Any]:
         """Get provider information and capabilities."""
-        pass
+        ...
     
-    @abstractmethod
     def is_available(self) -> bool:
         """Check if provider is available."""
-        pass
+        ...
 
 
-class IAIProviderFactory(ABC):
+class IAIProviderFactory(Protocol):
     """Factory interface for creating AI providers."""
     
-    @abstractmethod
     def create_provider(self, provider_type: str, config: Dict[str, Any]) -> IAIProvider:
         """Create AI provider instance."""
-        pass
+        ...
     
-    @abstractmethod
     def get_available_providers(self) -> list[str]:
         """Get list of available provider types."""
-        pass
\ No newline at end of file
+        ...
\ No newline at end of file
@@ -3,7 +3,7 @@ Base interfaces and abstract classes for the domain layer.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Protocol, TypeVar, Generic
+from typing import Any, Dict, List, Mapping, Optional, Protocol, TypeVar, Generic
 import asyncio
 
 T = TypeVar('T')
@@ -13,11 +13,13 @@ TResult = TypeVar('TResult')
 class ILogger(Protocol):
     """Logger interface for dependency injection."""
     
-    def debug(self, message: str, **kwargs: Any) -> None: ...
-    def info(self, message: str, **kwargs: Any) -> None: ...
-    def warning(self, message: str, **kwargs: Any) -> None: ...
-    def error(self, message: str, **kwargs: Any) -> None: ...
-    def critical(self, message: str, **kwargs: Any) -> None: ...
+    def debug(self, message: str, *args: Any, **kwargs: Any) -> None: ...
+    def info(self, message: str, *args: Any, **kwargs: Any) -> None: ...
+    def warning(self, message: str, *args: Any, **kwargs: Any) -> None: ...
+    def error(self, message: str, *args: Any, **kwargs: Any) -> None: ...
+    def critical(self, message: str, *args: Any, **kwargs: Any) -> None: ...
+    def is_enabled_for(self, level: int) -> bool: ...
+    def close(self) -> None: ...
 
 
 class IConfigurationManager(Protocol):
@@ -27,7 +29,7 @@ class IConfigurationManager(Protocol):
     def set(self, key: str, value: Any) -> None: ...
     def validate(self) -> bool: ...
     def reload(self) -> bool: ...
-    def get_all(self) -> Dict[str, Any]: ...
+    def get_all(self) -> Mapping[str, Any]: ...
 
 
 class IErrorHandler(Protocol):
@@ -62,12 +64,10 @@ class DomainService(ABC):
 
 
 class ValueObject(ABC):
-    """Base class for value objects."""
+    """Base class for value objects.
     
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, self.__class__):
-            return False
-        return self.__dict__ == other.__dict__
+    Value objects are frozen dataclasses; equality and hashing come from the
+    dataclass-generated field-tuple __eq__/__hash__.
+    """
     
-    def __hash__(self) -> int:
-        return hash(tuple(sorted(self.__dict__.items())))
\ No newline at end of file
+    __slots__ = ()
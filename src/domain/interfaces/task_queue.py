@@ -2,8 +2,7 @@
 Task queue interface definitions.
 """
 
-from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any, Callable, Awaitable
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Protocol
 from enum import Enum
 
 from src.domain.models.entities import BuildTask, TaskStatus
@@ -17,98 +16,87 @@ class QueuePriority(Enum):
     URGENT = 4
 
 
-class ITaskQueue(ABC):
-    """Interface for task queue operations."""
+class ITaskQueue(Protocol):
+    """Interface for task queue operations.
+    
+    Builds are consumed by a single dispatcher, so implementations should keep
+    one FIFO deque per priority level: enqueue/dequeue are O(1) and tasks of
+    equal priority stay FIFO. Cancellation should be O(1) by tombstoning the
+    entry in an id index and skipping it when it reaches the front of its deque.
+    """
     
-    @abstractmethod
     async def enqueue(self, task: BuildTask, priority: QueuePriority = QueuePriority.NORMAL) -> bool:
         """Add task to queue with specified priority."""
-        pass
+        ...
     
-    @abstractmethod
     async def dequeue(self) -> Optional[BuildTask]:
         """Remove and return next task from queue."""
-        pass
+        ...
     
-    @abstractmethod
     async def peek(self) -> Optional[BuildTask]:
         """Get next task without removing it from queue."""
-        pass
+        ...
     
-    @abstractmethod
     async def get_queue_size(self) -> int:
         """Get current queue size."""
-        pass
+        ...
     
-    @abstractmethod
     async def get_queue_status(self) -> Dict[str, Any]:
         """Get detailed queue status information."""
-        pass
+        ...
     
-    @abstractmethod
     async def cancel_task(self, task_id: str) -> bool:
         """Cancel a specific task in the queue."""
-        pass
+        ...
     
-    @abstractmethod
     async def clear_queue(self) -> int:
         """Clear all tasks from queue and return count of removed tasks."""
-        pass
+        ...
     
-    @abstractmethod
     async def get_task_position(self, task_id: str) -> Optional[int]:
         """Get position of task in queue (1-based)."""
-        pass
+        ...
 
 
-class ITaskExecutor(ABC):
+class ITaskExecutor(Protocol):
     """Interface for task execution."""
     
-    @abstractmethod
     async def execute_task(self, task: BuildTask) -> None:
         """Execute a single task."""
-        pass
+        ...
     
-    @abstractmethod
     async def cancel_current_task(self) -> bool:
         """Cancel currently executing task."""
-        pass
+        ...
     
-    @abstractmethod
     def is_executing(self) -> bool:
         """Check if executor is currently running a task."""
-        pass
+        ...
     
-    @abstractmethod
     def get_current_task(self) -> Optional[BuildTask]:
         """Get currently executing task."""
-        pass
+        ...
 
 
-class ITaskScheduler(ABC):
+class ITaskScheduler(Protocol):
     """Interface for task scheduling and coordination."""
     
-    @abstractmethod
     async def start(self) -> None:
         """Start the task scheduler."""
-        pass
+        ...
     
-    @abstractmethod
     async def stop(self) -> None:
         """Stop the task scheduler."""
-        pass
+        ...
     
-    @abstractmethod
     async def submit_task(self, task: BuildTask, priority: QueuePriority = QueuePriority.NORMAL) -> str:
         """Submit task for execution and return position info."""
-        pass
+        ...
     
-    @abstractmethod
     def add_task_callback(self, callback: Callable[[BuildTask, TaskStatus], Awaitable[None]]) -> None:
         """Add callback for task status changes."""
-        pass
+        ...
     
-    @abstractmethod
     def remove_task_callback(self, callback: Callable[[BuildTask, TaskStatus], Awaitable[None]]) -> None:
         """Remove task status change callback."""
-        pass
\ No newline at end of file
+        ...
\ No newline at end of file
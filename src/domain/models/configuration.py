@@ -4,11 +4,35 @@ Configuration models and validation schemas.
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, Mapping, Optional, Pattern, Tuple
 import os
+import re
 from src.domain.interfaces.base import ValueObject
 
 
+def _read_env_overrides() -> Dict[str, str]:
+    """Read raw environment variable overrides for BuildConfiguration."""
+    env_names = {
+        'workspace_root': 'BUILD_WORKSPACE_ROOT',
+        'publish_root_base': 'BUILD_PUBLISH_ROOT',
+        'web_port': 'BUILD_WEB_PORT',
+        'log_level': 'BUILD_LOG_LEVEL',
+    }
+    overrides: Dict[str, str] = {}
+    for key, env_name in env_names.items():
+        env_value = os.getenv(env_name)
+        if env_value is not None:
+            overrides[key] = env_value
+    return overrides
+
+
+# The environment is snapshotted once at import; later changes are not picked up.
+# Values stay raw strings here and are converted in from_dict, so a malformed
+# value surfaces as a configuration error instead of breaking the import.
+_ENV_OVERRIDES: Dict[str, str] = _read_env_overrides()
+
+
 @dataclass(frozen=True)
 class BuildConfiguration(ValueObject):
     """Configuration for the build system."""
@@ -36,16 +60,21 @@ class BuildConfiguration(ValueObject):
     # AI configurations
     ai_timeout: float = 30.0  # seconds
     ai_max_retries: int = 3
+    ai_log_tail_bytes: int = 128 * 1024  # log tail sent for failure analysis
     
     # Logging configuration
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
+    # Read-only dictionary view, built once since the configuration is frozen
+    _dict_view: Optional[Mapping[str, Any]] = field(init=False, repr=False, compare=False, default=None)
+    
     def __post_init__(self):
         """Validate configuration after initialization."""
         self._validate_paths()
         self._validate_thresholds()
         self._validate_network()
+        object.__setattr__(self, '_dict_view', MappingProxyType(self._build_dict()))
     
     def _validate_paths(self) -> None:
         """Validate path configurations."""
@@ -63,6 +92,9 @@ class BuildConfiguration(ValueObject):
         if self.disk_warn_threshold <= 0:
             raise ValueError("disk_warn_threshold must be positive")
         
+        if self.ai_log_tail_bytes <= 0:
+            raise ValueError("ai_log_tail_bytes must be positive")
+        
         if self.min_size_threshold >= self.disk_warn_threshold:
             raise ValueError("min_size_threshold should be less than disk_warn_threshold")
     
@@ -74,26 +106,17 @@ class BuildConfiguration(ValueObject):
     @classmethod
     def from_dict(cls, config_dict: Dict[str, Any]) -> 'BuildConfiguration':
         """Create configuration from dictionary with environment variable support."""
-        # Support environment variable overrides
-        env_overrides = {
-            'workspace_root': os.getenv('BUILD_WORKSPACE_ROOT'),
-            'publish_root_base': os.getenv('BUILD_PUBLISH_ROOT'),
-            'web_port': os.getenv('BUILD_WEB_PORT'),
-            'log_level': os.getenv('BUILD_LOG_LEVEL'),
-        }
-        
-        # Apply environment overrides
-        for key, env_value in env_overrides.items():
-            if env_value is not None:
-                if key == 'web_port':
-                    config_dict[key] = int(env_value)
-                else:
-                    config_dict[key] = env_value
-        
-        return cls(**config_dict)
+        overrides: Dict[str, Any] = dict(_ENV_OVERRIDES)
+        if 'web_port' in overrides:
+            overrides['web_port'] = int(overrides['web_port'])
+        return cls(**{**config_dict, **overrides})
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert configuration to dictionary."""
+    def to_dict(self) -> Mapping[str, Any]:
+        """Convert configuration to a read-only mapping (copy with dict() to modify)."""
+        return self._dict_view
+    
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build the plain dictionary form of the configuration."""
         return {
             'workspace_root': self.workspace_root,
             'publish_root_base': self.publish_root_base,
@@ -107,11 +130,36 @@ class BuildConfiguration(ValueObject):
             'max_log_lines': self.max_log_lines,
             'ai_timeout': self.ai_timeout,
             'ai_max_retries': self.ai_max_retries,
+            'ai_log_tail_bytes': self.ai_log_tail_bytes,
             'log_level': self.log_level,
             'log_format': self.log_format,
         }
 
 
+# Default progress stages (trigger -> message), shared read-only by every ScriptConfiguration
+_DEFAULT_PROGRESS_STAGES: Mapping[str, str] = MappingProxyType({
+    "Running AutomationTool...": "⚙️ Init UAT",
+    "Command: BuildCookRun": "🏗️ Start Build",
+    "Cook: ": "🍳 Cooking...",
+    "Stage: ": "📦 Staging...",
+    "Package: ": "🚚 Packaging...",
+    "BUILD SUCCESSFUL": "✅ Finalizing...",
+})
+
+
+def _compile_triggers(triggers: Iterable[str]) -> Pattern[str]:
+    """Compile triggers into a one-group-per-trigger alternation.
+    
+    The alternation sits in a lookahead so every position is tried and
+    overlapping triggers are not hidden by an earlier match.
+    """
+    return re.compile('(?=' + '|'.join(f'({re.escape(trigger)})' for trigger in triggers) + ')')
+
+
+_DEFAULT_PROGRESS_PATTERN = _compile_triggers(_DEFAULT_PROGRESS_STAGES)
+_DEFAULT_PROGRESS_MESSAGES: Tuple[str, ...] = tuple(_DEFAULT_PROGRESS_STAGES.values())
+
+
 @dataclass(frozen=True)
 class ScriptConfiguration(ValueObject):
     """Configuration for build scripts."""
@@ -126,14 +174,25 @@ class ScriptConfiguration(ValueObject):
     
     fallback_script: str = "packet.bat"
     
-    progress_stages: Dict[str, str] = field(default_factory=lambda: {
-        "Running AutomationTool...": "⚙️ Init UAT",
-        "Command: BuildCookRun": "🏗️ Start Build",
-        "Cook: ": "🍳 Cooking...",
-        "Stage: ": "📦 Staging...",
-        "Package: ": "🚚 Packaging...",
-        "BUILD SUCCESSFUL": "✅ Finalizing..."
-    })
+    # Defaults to the shared read-only stage map; pass a dict to override
+    progress_stages: Mapping[str, str] = field(default_factory=lambda: _DEFAULT_PROGRESS_STAGES)
+    
+    # Derived lookup state for get_progress_message, resolved once in __post_init__
+    _progress_pattern: Optional[Pattern[str]] = field(init=False, repr=False, compare=False, default=None)
+    _progress_messages: Tuple[str, ...] = field(init=False, repr=False, compare=False, default=())
+    
+    def __post_init__(self):
+        """Resolve progress triggers into one alternation regex."""
+        if self.progress_stages is _DEFAULT_PROGRESS_STAGES:
+            pattern, messages = _DEFAULT_PROGRESS_PATTERN, _DEFAULT_PROGRESS_MESSAGES
+        elif self.progress_stages:
+            pattern = _compile_triggers(self.progress_stages)
+            messages = tuple(self.progress_stages.values())
+        else:
+            return
+        
+        object.__setattr__(self, '_progress_pattern', pattern)
+        object.__setattr__(self, '_progress_messages', messages)
     
     def get_script_name(self, strategy: str) -> str:
         """Get script name for build strategy."""
@@ -141,7 +200,9 @@ class ScriptConfiguration(ValueObject):
     
     def get_progress_message(self, log_line: str) -> Optional[str]:
         """Get progress message for log line."""
-        for trigger, message in self.progress_stages.items():
-            if trigger in log_line:
-                return message
-        return None
\ No newline at end of file
+        if self._progress_pattern is None:
+            return None
+        # The first trigger in stage order wins, wherever it appears in the line
+        index = min((match.lastindex for match in self._progress_pattern.finditer(log_line)), default=None)
+        return self._progress_messages[index - 1] if index else None
+
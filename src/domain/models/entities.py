@@ -5,11 +5,23 @@ Domain entities for the build system.
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any, List
-import uuid
+from typing import Optional, Dict, Any, List, Tuple, Union
+import functools
+import itertools
+import os
+import re
+import time
 
 from src.domain.interfaces.base import ValueObject
 
+# Optional ciso8601 import (faster ISO timestamp parsing)
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+    HAS_CISO8601 = True
+except ImportError:
+    _parse_datetime = datetime.fromisoformat
+    HAS_CISO8601 = False
+
 
 class BuildStrategy(Enum):
     """Available build strategies."""
@@ -22,10 +34,19 @@ class BuildStrategy(Enum):
     @classmethod
     def from_string(cls, value: str) -> 'BuildStrategy':
         """Create BuildStrategy from string value."""
-        try:
-            return cls(value.lower())
-        except ValueError:
-            raise ValueError(f"Invalid build strategy: {value}. Valid options: {[s.value for s in cls]}")
+        return _strategy_from_str(value)
+
+
+_STR_TO_STRATEGY: Dict[str, BuildStrategy] = {s.value: s for s in BuildStrategy}
+
+
+@functools.lru_cache(maxsize=16)
+def _strategy_from_str(value: str) -> BuildStrategy:
+    """Resolve a strategy string; the handful of distinct inputs makes this cache-friendly."""
+    try:
+        return _STR_TO_STRATEGY[value.lower()]
+    except KeyError:
+        raise ValueError(f"Invalid build strategy: {value}. Valid options: {list(_STR_TO_STRATEGY)}") from None
 
 
 class TaskStatus(Enum):
@@ -46,7 +67,36 @@ class BuildType(Enum):
     UNKNOWN = "Unknown"
 
 
-@dataclass
+# Task ids only need to be unique across runs of this plugin; a per-process
+# prefix (start time + pid) plus a counter is far cheaper than uuid4()
+_TASK_ID_PREFIX = f"{time.time_ns():x}-{os.getpid():x}"
+_TASK_ID_COUNTER = itertools.count(1)
+
+
+def _new_task_id() -> str:
+    """Generate a process-unique, restart-safe task id."""
+    return f"{_TASK_ID_PREFIX}-{next(_TASK_ID_COUNTER):x}"
+
+
+_INVALID_BRANCH_CHARS = ['<', '>', ':', '"', '|', '?', '*']
+_INVALID_BRANCH_RE = re.compile(r'[<>:"|?*]')
+
+
+def _to_iso(timestamp: Optional[float]) -> Optional[str]:
+    """Format an epoch timestamp as a local ISO string."""
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+def _from_iso(value: Union[str, float, None]) -> Optional[float]:
+    """Parse a local ISO string (or a raw epoch number) into an epoch timestamp."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_datetime(value).timestamp()
+
+
+@dataclass(slots=True)
 class BuildTask:
     """Represents a build task with validation."""
     
@@ -55,12 +105,13 @@ class BuildTask:
     strategy: BuildStrategy
     
     # Optional fields with defaults
-    task_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    task_id: str = field(default_factory=_new_task_id)
     arg3: Optional[str] = None
     status: TaskStatus = TaskStatus.PENDING
-    created_at: datetime = field(default_factory=datetime.now)
-    started_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
+    # Timestamps are epoch seconds; ISO strings are only produced on serialization
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    completed_at: Optional[float] = None
     
     # Paths (computed from branch)
     bat_dir: Optional[str] = None
@@ -86,9 +137,8 @@ class BuildTask:
             raise ValueError("Branch cannot be only whitespace")
         
         # Basic validation for common invalid characters
-        invalid_chars = ['<', '>', ':', '"', '|', '?', '*']
-        if any(char in self.branch for char in invalid_chars):
-            raise ValueError(f"Branch name contains invalid characters: {invalid_chars}")
+        if _INVALID_BRANCH_RE.search(self.branch):
+            raise ValueError(f"Branch name contains invalid characters: {_INVALID_BRANCH_CHARS}")
     
     def _validate_strategy(self) -> None:
         """Validate build strategy."""
@@ -109,7 +159,7 @@ class BuildTask:
             raise ValueError(f"Cannot start task with status {self.status}")
         
         self.status = TaskStatus.RUNNING
-        self.started_at = datetime.now()
+        self.started_at = time.time()
         self.process_id = process_id
     
     def complete_execution(self, return_code: int, error_message: Optional[str] = None) -> None:
@@ -117,7 +167,7 @@ class BuildTask:
         if self.status != TaskStatus.RUNNING:
             raise ValueError(f"Cannot complete task with status {self.status}")
         
-        self.completed_at = datetime.now()
+        self.completed_at = time.time()
         self.return_code = return_code
         self.error_message = error_message
         
@@ -132,15 +182,15 @@ class BuildTask:
             raise ValueError(f"Cannot cancel task with status {self.status}")
         
         self.status = TaskStatus.CANCELLED
-        self.completed_at = datetime.now()
+        self.completed_at = time.time()
         self.error_message = error_message or "Task cancelled by user"
     
     def get_duration(self) -> Optional[float]:
         """Get task execution duration in seconds."""
-        if not self.started_at or not self.completed_at:
+        if self.started_at is None or self.completed_at is None:
             return None
         
-        return (self.completed_at - self.started_at).total_seconds()
+        return self.completed_at - self.started_at
     
     def is_finished(self) -> bool:
         """Check if task is in a finished state."""
@@ -154,9 +204,9 @@ class BuildTask:
             'strategy': self.strategy.value,
             'arg3': self.arg3,
             'status': self.status.value,
-            'created_at': self.created_at.isoformat(),
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': _to_iso(self.created_at),
+            'started_at': _to_iso(self.started_at),
+            'completed_at': _to_iso(self.completed_at),
             'bat_dir': self.bat_dir,
             'publish_root': self.publish_root,
             'process_id': self.process_id,
@@ -167,20 +217,15 @@ class BuildTask:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BuildTask':
         """Create task from dictionary."""
-        # Parse datetime fields
-        created_at = datetime.fromisoformat(data['created_at'])
-        started_at = datetime.fromisoformat(data['started_at']) if data.get('started_at') else None
-        completed_at = datetime.fromisoformat(data['completed_at']) if data.get('completed_at') else None
-        
         return cls(
             task_id=data['task_id'],
             branch=data['branch'],
-            strategy=BuildStrategy(data['strategy']),
+            strategy=BuildStrategy.from_string(data['strategy']),
             arg3=data.get('arg3'),
             status=TaskStatus(data['status']),
-            created_at=created_at,
-            started_at=started_at,
-            completed_at=completed_at,
+            created_at=_from_iso(data['created_at']),
+            started_at=_from_iso(data.get('started_at')),
+            completed_at=_from_iso(data.get('completed_at')),
             bat_dir=data.get('bat_dir'),
             publish_root=data.get('publish_root'),
             process_id=data.get('process_id'),
@@ -189,7 +234,7 @@ class BuildTask:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BuildInfo(ValueObject):
     """Information about a build artifact."""
     
@@ -215,30 +260,7 @@ class BuildInfo(ValueObject):
     @classmethod
     def parse_from_folder_name(cls, path: str, folder_name: str, size_str: str, size_bytes: int) -> 'BuildInfo':
         """Parse build info from folder name using existing logic."""
-        ymd = "?"
-        version = "?"
-        build_type = BuildType.UNKNOWN
-        
-        try:
-            parts = folder_name.split('_')
-            if len(parts) >= 1:
-                ymd = parts[0]
-            
-            if "ver" in parts:
-                version = parts[parts.index("ver") + 1]
-            elif "main" in parts:
-                version = parts[parts.index("main") + 1]
-            
-            if "Development" in parts:
-                build_type = BuildType.DEVELOPMENT
-            elif "Debug" in parts:
-                build_type = BuildType.DEBUG
-            elif "main" in parts:
-                build_type = BuildType.SHIPPING
-                
-        except (IndexError, ValueError):
-            # If parsing fails, use defaults
-            pass
+        ymd, version, build_type = _parse_folder_name(folder_name)
         
         return cls(
             path=path,
@@ -251,14 +273,52 @@ class BuildInfo(ValueObject):
         )
 
 
-@dataclass(frozen=True)
+# Folder names are '_'-separated tokens; tags only match whole tokens
+_VERSION_TAG_RES = tuple(re.compile(rf'(?:^|_){tag}(?:_([^_]*)|$)') for tag in ('ver', 'main'))
+_BUILD_TYPE_TAG_RE = re.compile(r'(?:^|_)(Development|Debug|main)(?=_|$)')
+_BUILD_TYPE_TAGS: Dict[str, BuildType] = {
+    'Development': BuildType.DEVELOPMENT,
+    'Debug': BuildType.DEBUG,
+    'main': BuildType.SHIPPING,
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_folder_name(folder_name: str) -> Tuple[str, str, BuildType]:
+    """Extract (ymd, version, build type) from a build folder name.
+    
+    Publish directories are rescanned often and folder names never change,
+    so results are memoised.
+    """
+    ymd = folder_name.partition('_')[0]
+    version = "?"
+    
+    # "ver" takes precedence over "main" wherever it appears
+    for version_re in _VERSION_TAG_RES:
+        match = version_re.search(folder_name)
+        if match:
+            if match.group(1) is None:
+                # Tag is the last token - no version follows, use defaults
+                return ymd, version, BuildType.UNKNOWN
+            version = match.group(1)
+            break
+    
+    tags = set(_BUILD_TYPE_TAG_RE.findall(folder_name))
+    for tag, build_type in _BUILD_TYPE_TAGS.items():
+        if tag in tags:
+            return ymd, version, build_type
+    
+    return ymd, version, BuildType.UNKNOWN
+
+
+@dataclass(frozen=True, slots=True)
 class ProgressUpdate(ValueObject):
     """Progress update for build execution."""
     
     task_id: str
     stage: str
     message: str
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: float = field(default_factory=time.time)
     
     def __post_init__(self):
         """Validate progress update."""
@@ -272,7 +332,16 @@ class ProgressUpdate(ValueObject):
             raise ValueError("Message must be a non-empty string")
 
 
-@dataclass
+_RESULT_SUCCESS_TMPL = (
+    "🎉 [{branch}] 打包成功！\n"
+    "⏱️ 耗时: {duration}\n"
+    "🔢 版本: {version} ({build_type})\n"
+    "💾 大小: {size}"
+)
+_RESULT_FAILURE_TMPL = "⚠️ [{branch}] 打包失败: {error}"
+
+
+@dataclass(slots=True)
 class BuildResult:
     """Result of a build operation."""
     
@@ -297,10 +366,12 @@ class BuildResult:
     def get_user_message(self) -> str:
         """Get user-friendly message for the build result."""
         if self.success and self.build_info:
-            duration_str = f"{self.duration:.1f}s" if self.duration else "unknown"
-            return (f"🎉 [{self.task.branch}] 打包成功！\n"
-                   f"⏱️ 耗时: {duration_str}\n"
-                   f"🔢 版本: {self.build_info.version} ({self.build_info.build_type.value})\n"
-                   f"💾 大小: {self.build_info.size_str}")
+            return _RESULT_SUCCESS_TMPL.format_map({
+                'branch': self.task.branch,
+                'duration': f"{self.duration:.1f}s" if self.duration else "unknown",
+                'version': self.build_info.version,
+                'build_type': self.build_info.build_type.value,
+                'size': self.build_info.size_str,
+            })
         else:
-            return f"⚠️ [{self.task.branch}] 打包失败: {self.error_message}"
\ No newline at end of file
+            return _RESULT_FAILURE_TMPL.format(branch=self.task.branch, error=self.error_message)
\ No newline at end of file
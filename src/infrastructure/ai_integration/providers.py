@@ -3,8 +3,16 @@ AI provider implementations with timeout and retry mechanisms.
 """
 
 import asyncio
+import dataclasses
+import functools
+import hashlib
+import io
+import os
+import random
+import re
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
 from astrbot.api.star import Context
 
 from src.domain.interfaces.base import ILogger
@@ -12,15 +20,82 @@ from src.domain.interfaces.ai_provider import IAIProvider, AIRequest, AIResponse
 from src.domain.exceptions import AIServiceError
 
 
+# Prompt templates
+_FAILURE_PROMPT = (
+    "UE5打包失败分析。请分析以下日志并提供：\n"
+    "1. 核心失败原因\n"
+    "2. 具体修复建议\n"
+    "3. 预防措施\n\n"
+    "日志内容:\n{smart_log}"
+)
+_CHANGELOG_PROMPT = (
+    "这是最近的 Perforce 提交记录，请总结为一份通俗易懂的'更新公告'：\n"
+    "要求：\n"
+    "1. 去除技术细节，使用用户友好的语言\n"
+    "2. 按功能分类整理\n"
+    "3. 突出重要变更\n"
+    "4. 保持简洁明了\n\n"
+    "提交记录:\n{changes_text}"
+)
+
+# Smart log extraction: error lines are found with a single regex pass
+_ERROR_KEYWORDS: Tuple[str, ...] = ("Error:", "Critical:", "Fatal:", "error C", "Exception:", "Failed:")
+_ERROR_KEYWORDS_RE = re.compile('|'.join(map(re.escape, _ERROR_KEYWORDS)))
+_ERROR_KEYWORDS_BYTES_RE = re.compile(_ERROR_KEYWORDS_RE.pattern.encode('ascii'))
+_TAIL_LINES = 30
+_ERROR_LINES_KEPT = 20
+
+
 class AstrBotAIProvider:
     """AI provider implementation using AstrBot's provider system."""
     
-    def __init__(self, context: Context, logger: ILogger, timeout: float = 30.0, max_retries: int = 3):
+    AVAILABILITY_TTL = 5.0  # seconds
+    
+    def __init__(self, context: Context, logger: ILogger, timeout: float = 30.0, max_retries: int = 3,
+                 cache_size: int = 128, cache_ttl: float = 3600.0,
+                 backoff_cap: float = 30.0, total_deadline: Optional[float] = None,
+                 max_concurrent: int = 4):
         self.context = context
         self.logger = logger
         self.timeout = timeout
         self.max_retries = max_retries
         self.provider_name = "AstrBot"
+        
+        # Retry budget: longest single backoff, and optional overall limit in seconds
+        self.backoff_cap = backoff_cap
+        self.total_deadline = total_deadline
+        
+        # Bounds upstream requests in flight; waiting for a slot does not count against timeout
+        self.max_concurrent = max_concurrent
+        self._request_slots = asyncio.Semaphore(max_concurrent)
+        
+        # (checked_at, available) from the last provider lookup
+        self._availability: Tuple[float, bool] = (0.0, False)
+        
+        # Successful analysis/changelog responses keyed by prompt digest (LRU order)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: 'OrderedDict[str, Tuple[float, AIResponse]]' = OrderedDict()
+        self._inflight: Dict[str, 'asyncio.Future[AIResponse]'] = {}
+    
+    @classmethod
+    def from_config(cls, logger: ILogger, config: Dict[str, Any]) -> 'AstrBotAIProvider':
+        """Create provider from factory configuration."""
+        context = config.get('context')
+        if not context:
+            raise AIServiceError("AstrBot context required for astrbot provider")
+        
+        return cls(
+            context,
+            logger,
+            timeout=config.get('timeout', 30.0),
+            max_retries=config.get('max_retries', 3),
+            cache_size=config.get('cache_size', 128),
+            cache_ttl=config.get('cache_ttl', 3600.0),
+            backoff_cap=config.get('backoff_cap', 30.0),
+            total_deadline=config.get('total_deadline'),
+            max_concurrent=config.get('max_concurrent', 4)
+        )
     
     async def text_chat(self, prompt: str, session_id: Optional[str] = None, **kwargs) -> AIResponse:
         """Send text chat request to AI provider."""
@@ -32,44 +107,39 @@ class AstrBotAIProvider:
         
         return await self._execute_with_retry(self._text_chat_impl, request)
     
-    async def analyze_failure(self, log_content: str, context: Optional[Dict[str, Any]] = None) -> AIResponse:
+    async def analyze_failure(self, log_content: Union[str, bytes],
+                              context: Optional[Dict[str, Any]] = None) -> AIResponse:
         """Analyze build failure logs and provide suggestions."""
         # Extract smart log content to reduce token usage
         smart_log = self._extract_smart_log(log_content)
+        return await self._analyze_smart_log(smart_log, context)
+    
+    async def analyze_failure_from_path(self, log_path: str, context: Optional[Dict[str, Any]] = None,
+                                        max_bytes: Optional[int] = None) -> AIResponse:
+        """Analyze a build failure log file without loading it into memory.
         
-        prompt = (
-            "UE5打包失败分析。请分析以下日志并提供：\n"
-            "1. 核心失败原因\n"
-            "2. 具体修复建议\n"
-            "3. 预防措施\n\n"
-            f"日志内容:\n{smart_log}"
-        )
-        
+        Only the last max_bytes of the file are scanned when given.
+        """
+        smart_log = await asyncio.to_thread(self._extract_smart_log_from_file, log_path, max_bytes)
+        return await self._analyze_smart_log(smart_log, context)
+    
+    async def _analyze_smart_log(self, smart_log: str, context: Optional[Dict[str, Any]]) -> AIResponse:
+        """Build the failure analysis prompt from extracted log content."""
         request = AIRequest(
-            prompt=prompt,
+            prompt=_FAILURE_PROMPT.format(smart_log=smart_log),
             context=context or {}
         )
         
-        return await self._execute_with_retry(self._text_chat_impl, request)
+        return await self._cached_execute(request)
     
     async def generate_changelog(self, changes_text: str, context: Optional[Dict[str, Any]] = None) -> AIResponse:
         """Generate user-friendly changelog from technical changes."""
-        prompt = (
-            "这是最近的 Perforce 提交记录，请总结为一份通俗易懂的'更新公告'：\n"
-            "要求：\n"
-            "1. 去除技术细节，使用用户友好的语言\n"
-            "2. 按功能分类整理\n"
-            "3. 突出重要变更\n"
-            "4. 保持简洁明了\n\n"
-            f"提交记录:\n{changes_text}"
-        )
-        
         request = AIRequest(
-            prompt=prompt,
+            prompt=_CHANGELOG_PROMPT.format(changes_text=changes_text),
             context=context or {}
         )
         
-        return await self._execute_with_retry(self._text_chat_impl, request)
+        return await self._cached_execute(request)
     
     def get_provider_info(self) -> Dict[str, Any]:
         """Get provider information and capabilities."""
@@ -78,33 +148,93 @@ class AstrBotAIProvider:
             'type': 'astrbot',
             'timeout': self.timeout,
             'max_retries': self.max_retries,
+            'total_deadline': self.total_deadline,
+            'max_concurrent': self.max_concurrent,
             'capabilities': ['text_chat', 'failure_analysis', 'changelog_generation'],
+            'cache_size': self.cache_size,
+            'cache_ttl': self.cache_ttl,
             'available': self.is_available()
         }
     
     def is_available(self) -> bool:
-        """Check if provider is available."""
+        """Check if provider is available (cached for AVAILABILITY_TTL seconds)."""
+        now = time.monotonic()
+        checked_at, available = self._availability
+        if checked_at and now - checked_at < self.AVAILABILITY_TTL:
+            return available
+        
         try:
-            provider = self.context.get_using_provider()
-            return provider is not None
+            available = self.context.get_using_provider() is not None
         except Exception:
-            return False
+            available = False
+        
+        self._availability = (now, available)
+        return available
+    
+    async def _cached_execute(self, request: AIRequest) -> AIResponse:
+        """Execute request, reusing a recent successful response for an identical prompt."""
+        key = hashlib.sha256(request.prompt.encode('utf-8')).hexdigest()
+        now = time.monotonic()
+        
+        entry = self._cache.get(key)
+        if entry is not None:
+            stored_at, cached_response = entry
+            if now - stored_at < self.cache_ttl:
+                self._cache.move_to_end(key)
+                self.logger.debug("AI response served from cache", provider=self.provider_name)
+                return dataclasses.replace(cached_response)
+            del self._cache[key]
+        
+        # Identical prompts already in flight share one upstream request
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache(key, request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        
+        # Shielded so a cancelled caller does not cancel the request for the others
+        response = await asyncio.shield(task)
+        return dataclasses.replace(response)
+    
+    async def _fetch_and_cache(self, key: str, request: AIRequest) -> AIResponse:
+        """Execute request and cache a successful response under key."""
+        response = await self._execute_with_retry(self._text_chat_impl, request)
+        
+        if response.success and self.cache_size > 0:
+            self._cache[key] = (time.monotonic(), dataclasses.replace(response, cached=True))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        
+        return response
     
     async def _execute_with_retry(self, func, request: AIRequest) -> AIResponse:
         """Execute AI request with timeout and retry logic."""
         last_error = None
+        attempts = 0
+        deadline = None if self.total_deadline is None else time.monotonic() + self.total_deadline
         
         for attempt in range(self.max_retries):
+            timeout = self.timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    last_error = last_error or f"Deadline of {self.total_deadline}s exceeded"
+                    break
+                timeout = min(timeout, remaining)
+            
+            attempts += 1
             try:
-                start_time = time.time()
-                
-                # Execute with timeout
-                response = await asyncio.wait_for(
-                    func(request),
-                    timeout=self.timeout
-                )
+                async with self._request_slots:
+                    start_time = time.monotonic()
+                    
+                    # Execute with timeout
+                    response = await asyncio.wait_for(
+                        func(request),
+                        timeout=timeout
+                    )
                 
-                response.response_time = time.time() - start_time
+                response.response_time = time.monotonic() - start_time
                 response.provider = self.provider_name
                 
                 self.logger.info(
@@ -117,20 +247,22 @@ class AstrBotAIProvider:
                 return response
                 
             except asyncio.TimeoutError:
-                last_error = f"Request timeout after {self.timeout}s"
+                last_error = f"Request timeout after {timeout:.1f}s"
                 self.logger.warning(f"AI request timeout (attempt {attempt + 1})")
                 
             except Exception as e:
                 last_error = str(e)
                 self.logger.warning(f"AI request failed (attempt {attempt + 1}): {e}")
             
-            # Wait before retry (exponential backoff)
+            # Wait before retry (jittered exponential backoff, capped)
             if attempt < self.max_retries - 1:
-                wait_time = 2 ** attempt  # 1s, 2s, 4s...
+                wait_time = min(self.backoff_cap, random.uniform(1.0, 3.0) * (2 ** attempt))
+                if deadline is not None and time.monotonic() + wait_time >= deadline:
+                    break  # Retry could not start before the deadline
                 await asyncio.sleep(wait_time)
         
         # All retries failed
-        error_msg = f"AI request failed after {self.max_retries} attempts: {last_error}"
+        error_msg = f"AI request failed after {attempts} attempts: {last_error}"
         self.logger.error(error_msg)
         
         return AIResponse(
@@ -157,48 +289,138 @@ class AstrBotAIProvider:
             )
             
         except Exception as e:
+            self._availability = (0.0, False)  # Re-check on the next is_available call
             raise AIServiceError(f"AstrBot provider error: {e}", provider=self.provider_name)
     
-    def _extract_smart_log(self, text: str, max_len: int = 4000) -> str:
-        """Extract relevant parts of log for AI analysis."""
+    def _extract_smart_log(self, text: Union[str, bytes], max_len: int = 4000) -> str:
+        """Extract relevant parts of log for AI analysis.
+        
+        Raw bytes are scanned as-is; only the selected lines are decoded.
+        """
         if not text:
             return "(Empty log)"
         
-        lines = text.splitlines()
+        if isinstance(text, bytes):
+            newline, error_re = b'\n', _ERROR_KEYWORDS_BYTES_RE
+            decode = functools.partial(bytes.decode, encoding='utf-8', errors='ignore')
+        else:
+            newline, error_re = '\n', _ERROR_KEYWORDS_RE
+            decode = str
         
-        # Get last 30 lines (tail)
-        tail_lines = lines[-30:]
+        # Last 30 lines (tail); everything before the cutoff is scanned for errors
+        if text.endswith(newline):
+            text = text[:-1]
+        parts = text.rsplit(newline, _TAIL_LINES)
+        if len(parts) > _TAIL_LINES:
+            head = parts[0]
+            tail_lines = [decode(line).rstrip('\r') for line in parts[1:]]
+        else:
+            head = text[:0]
+            tail_lines = [decode(line).rstrip('\r') for line in parts]
         
-        # Extract error lines from the rest
-        error_lines = []
-        error_keywords = ["Error:", "Critical:", "Fatal:", "error C", "Exception:", "Failed:"]
+        # One regex pass over the head; line numbers are counted incrementally
+        first_errors = []
+        last_errors = deque(maxlen=_ERROR_LINES_KEPT // 2)
+        error_count = 0
+        lineno = 1
+        counted_to = 0
+        pos = 0
+        while True:
+            match = error_re.search(head, pos)
+            if match is None:
+                break
+            line_start = head.rfind(newline, 0, match.start()) + 1
+            line_end = head.find(newline, match.end())
+            if line_end == -1:
+                line_end = len(head)
+            lineno += head.count(newline, counted_to, line_start)
+            counted_to = line_start
+            
+            error_line = f"[L{lineno}] {decode(head[line_start:line_end]).strip()}"
+            error_count += 1
+            if len(first_errors) < _ERROR_LINES_KEPT // 2:
+                first_errors.append(error_line)
+            else:
+                last_errors.append(error_line)
+            pos = line_end + 1
         
-        for i, line in enumerate(lines[:-30]):  # Exclude tail lines
-            if any(keyword in line for keyword in error_keywords):
-                error_lines.append(f"[L{i+1}] {line.strip()}")
+        return self._format_smart_log(first_errors, last_errors, error_count, tail_lines, max_len)
+    
+    def _extract_smart_log_from_file(self, path: str, max_bytes: Optional[int] = None,
+                                     max_len: int = 4000) -> str:
+        """Extract relevant parts of a log file, streaming it line by line."""
+        tail = deque(maxlen=_TAIL_LINES)
+        first_errors = []
+        last_errors = deque(maxlen=_ERROR_LINES_KEPT // 2)
+        error_count = 0
         
+        with open(path, 'rb') as f:
+            if max_bytes:
+                size = os.fstat(f.fileno()).st_size
+                if size > max_bytes:
+                    f.seek(size - max_bytes)
+                    f.readline()  # Skip the partial first line
+            
+            # Lines are only checked for errors once they fall out of the tail window
+            for lineno, raw_line in enumerate(f, 1):
+                if len(tail) == _TAIL_LINES:
+                    old_lineno, old_line = tail[0]
+                    if _ERROR_KEYWORDS_RE.search(old_line):
+                        error_line = f"[L{old_lineno}] {old_line.strip()}"
+                        error_count += 1
+                        if len(first_errors) < _ERROR_LINES_KEPT // 2:
+                            first_errors.append(error_line)
+                        else:
+                            last_errors.append(error_line)
+                tail.append((lineno, raw_line.decode('utf-8', errors='ignore').rstrip('\r\n')))
+        
+        if not tail:
+            return "(Empty log)"
+        
+        tail_lines = [line for _, line in tail]
+        return self._format_smart_log(first_errors, last_errors, error_count, tail_lines, max_len)
+    
+    @staticmethod
+    def _format_smart_log(first_errors: List[str], last_errors: Iterable[str], error_count: int,
+                          tail_lines: List[str], max_len: int) -> str:
+        """Combine collected error and tail lines into the prompt excerpt."""
         # Limit error lines if too many
-        if len(error_lines) > 20:
-            error_lines = error_lines[:10] + ["..."] + error_lines[-10:]
+        if error_count > _ERROR_LINES_KEPT:
+            error_lines = first_errors + ["..."] + list(last_errors)
+        else:
+            error_lines = first_errors + list(last_errors)
         
-        # Combine sections
-        result_parts = []
+        # Write sections into one buffer, stopping once max_len characters are in
+        buf = io.StringIO()
+        remaining = max_len
         
-        if error_lines:
-            result_parts.append("关键错误:")
-            result_parts.extend(error_lines)
+        def emit(chunk: str) -> bool:
+            nonlocal remaining
+            if len(chunk) > remaining:
+                buf.write(chunk[:remaining])
+                remaining = -1
+                return False
+            buf.write(chunk)
+            remaining -= len(chunk)
+            return True
         
-        result_parts.append("\n最近输出:")
-        result_parts.extend(tail_lines)
+        sections = []
+        if error_lines:
+            sections.append(("关键错误:", error_lines))
+        sections.append(("\n最近输出:", tail_lines))
         
-        result = "\n".join(result_parts)
+        separator = ""
+        for title, lines in sections:
+            if not emit(separator + title):
+                break
+            separator = "\n"
+            if not all(emit("\n" + line) for line in lines):
+                break
         
-        # Truncate if too long
-        if len(result) > max_len:
-            result = result[:max_len] + "\n[日志已截断]"
+        if remaining < 0:
+            buf.write("\n[日志已截断]")
         
-        return result
-
+        return buf.getvalue()
 
 class FallbackAIProvider:
     """Fallback AI provider that returns simple responses when main provider fails."""
@@ -207,6 +429,11 @@ class FallbackAIProvider:
         self.logger = logger
         self.provider_name = "Fallback"
     
+    @classmethod
+    def from_config(cls, logger: ILogger, config: Dict[str, Any]) -> 'FallbackAIProvider':
+        """Create provider from factory configuration."""
+        return cls(logger)
+    
     async def text_chat(self, prompt: str, session_id: Optional[str] = None, **kwargs) -> AIResponse:
         """Return simple fallback response."""
         return AIResponse(
@@ -216,7 +443,8 @@ class FallbackAIProvider:
             provider=self.provider_name
         )
     
-    async def analyze_failure(self, log_content: str, context: Optional[Dict[str, Any]] = None) -> AIResponse:
+    async def analyze_failure(self, log_content: Union[str, bytes],
+                              context: Optional[Dict[str, Any]] = None) -> AIResponse:
         """Return simple failure analysis."""
         return AIResponse(
             completion_text=(
@@ -231,6 +459,11 @@ class FallbackAIProvider:
             provider=self.provider_name
         )
     
+    async def analyze_failure_from_path(self, log_path: str, context: Optional[Dict[str, Any]] = None,
+                                        max_bytes: Optional[int] = None) -> AIResponse:
+        """Return simple failure analysis."""
+        return await self.analyze_failure("", context)
+    
     async def generate_changelog(self, changes_text: str, context: Optional[Dict[str, Any]] = None) -> AIResponse:
         """Return simple changelog."""
         return AIResponse(
@@ -266,29 +499,13 @@ class AIProviderFactory:
     
     def create_provider(self, provider_type: str, config: Dict[str, Any]) -> IAIProvider:
         """Create AI provider instance with fallback."""
+        provider_class = self._providers.get(provider_type)
+        if provider_class is None:
+            self.logger.warning(f"Unknown AI provider type: {provider_type}, using fallback")
+            return FallbackAIProvider(self.logger)
+        
         try:
-            if provider_type not in self._providers:
-                self.logger.warning(f"Unknown AI provider type: {provider_type}, using fallback")
-                return FallbackAIProvider(self.logger)
-            
-            provider_class = self._providers[provider_type]
-            
-            if provider_type == 'astrbot':
-                context = config.get('context')
-                timeout = config.get('timeout', 30.0)
-                max_retries = config.get('max_retries', 3)
-                
-                if not context:
-                    raise AIServiceError("AstrBot context required for astrbot provider")
-                
-                return provider_class(context, self.logger, timeout, max_retries)
-            
-            elif provider_type == 'fallback':
-                return provider_class(self.logger)
-            
-            else:
-                raise AIServiceError(f"Unsupported provider configuration: {provider_type}")
-                
+            return provider_class.from_config(self.logger, config)
         except Exception as e:
             self.logger.error(f"Failed to create AI provider {provider_type}: {e}")
             # Always fallback to simple provider
@@ -299,6 +516,9 @@ class AIProviderFactory:
         return list(self._providers.keys())
     
     def register_provider(self, provider_type: str, provider_class: type) -> None:
-        """Register custom AI provider."""
+        """Register custom AI provider.
+        
+        provider_class must define from_config(logger, config).
+        """
         self._providers[provider_type] = provider_class
         self.logger.info(f"Registered AI provider: {provider_type}")
\ No newline at end of file
@@ -2,45 +2,87 @@
 Configuration manager implementation with validation and hot-reload support.
 """
 
+import asyncio
+import hashlib
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Callable, Mapping
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import PatternMatchingEventHandler
 import threading
 import time
 
 from src.domain.interfaces.base import ILogger, IConfigurationManager
 from src.domain.models.configuration import BuildConfiguration
 
+# Optional orjson import (faster configuration parsing)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional watchfiles import (asyncio-native hot-reload)
+try:
+    import watchfiles
+    HAS_WATCHFILES = True
+except ImportError:
+    HAS_WATCHFILES = False
+
 
 class ConfigurationError(Exception):
     """Configuration related errors."""
     pass
 
 
-class ConfigurationFileHandler(FileSystemEventHandler):
-    """File system event handler for configuration hot-reload."""
+class ConfigurationFileHandler(PatternMatchingEventHandler):
+    """File system event handler for configuration hot-reload.
+    
+    Watchdog's pattern filter drops events for other files in the directory.
+    Reloads are debounced on the trailing edge so a save that arrives as
+    several events is read once, after the last of them.
+    """
     
     def __init__(self, config_manager: 'ConfigurationManager'):
+        super().__init__(
+            patterns=[config_manager.config_file_path.name],
+            ignore_directories=True,
+            case_sensitive=True
+        )
         self.config_manager = config_manager
-        self.last_modified = 0
         self.debounce_seconds = 1.0  # Prevent multiple rapid reloads
+        self._timer: Optional[threading.Timer] = None
+        self._timer_lock = threading.Lock()
     
     def on_modified(self, event):
         """Handle file modification events."""
-        if event.is_directory:
-            return
-        
-        current_time = time.time()
-        if current_time - self.last_modified < self.debounce_seconds:
-            return
-        
-        self.last_modified = current_time
-        
-        if event.src_path == str(self.config_manager.config_file_path):
-            self.config_manager._reload_from_file()
+        self._schedule_reload()
+    
+    def on_created(self, event):
+        """Handle the file being recreated."""
+        self._schedule_reload()
+    
+    def on_moved(self, event):
+        """Handle editors that save by renaming a temporary file over the config."""
+        self._schedule_reload()
+    
+    def cancel(self) -> None:
+        """Cancel a pending reload."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+    
+    def _schedule_reload(self) -> None:
+        """(Re)start the debounce timer; watchdog may call this from several threads."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seconds, self.config_manager._reload_from_file)
+            self._timer.daemon = True
+            self._timer.start()
 
 
 class ConfigurationManager:
@@ -49,36 +91,38 @@ class ConfigurationManager:
     def __init__(self, config_file_path: str, logger: ILogger):
         self.config_file_path = Path(config_file_path)
         self.logger = logger
-        self._config_data: Dict[str, Any] = {}
+        # Read-only view swapped wholesale on every change; readers need no lock or copy
+        self._snapshot: Mapping[str, Any] = MappingProxyType({})
         self._build_config: Optional[BuildConfiguration] = None
         self._observers: list[Observer] = []
-        self._change_callbacks: list[Callable[[Dict[str, Any]], None]] = []
+        self._file_handlers: list[ConfigurationFileHandler] = []
+        self._watch_task: Optional[asyncio.Task] = None
+        self._change_callbacks: list[Callable[[Mapping[str, Any]], None]] = []
         self._lock = threading.RLock()
+        self._last_digest: Optional[bytes] = None  # Digest of the file content last loaded or saved
         
         # Load initial configuration
         self._load_configuration()
         
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key."""
-        with self._lock:
-            return self._config_data.get(key, default)
+        return self._snapshot.get(key, default)
     
     def set(self, key: str, value: Any) -> None:
         """Set configuration value."""
         with self._lock:
-            self._config_data[key] = value
-            self._rebuild_config()
+            config_data = dict(self._snapshot)
+            config_data[key] = value
+            self._publish(config_data)
     
-    def get_all(self) -> Dict[str, Any]:
-        """Get all configuration data."""
-        with self._lock:
-            return self._config_data.copy()
+    def get_all(self) -> Mapping[str, Any]:
+        """Get all configuration data as a read-only snapshot."""
+        return self._snapshot
     
     def validate(self) -> bool:
         """Validate current configuration."""
         try:
-            with self._lock:
-                BuildConfiguration.from_dict(self._config_data)
+            BuildConfiguration.from_dict(self._snapshot)
             return True
         except Exception as e:
             self.logger.error(f"Configuration validation failed: {e}")
@@ -92,7 +136,7 @@ class ConfigurationManager:
         """Get typed build configuration object."""
         with self._lock:
             if self._build_config is None:
-                self._rebuild_config()
+                self._publish(dict(self._snapshot))
             return self._build_config
     
     def start_hot_reload(self) -> None:
@@ -110,18 +154,68 @@ class ConfigurationManager:
         )
         observer.start()
         self._observers.append(observer)
+        self._file_handlers.append(event_handler)
+        
+        self.logger.info(f"Started hot-reload for configuration file: {self.config_file_path}")
+    
+    async def start_hot_reload_async(self) -> None:
+        """Start watching the configuration file from the running event loop.
+        
+        Uses watchfiles when installed, so no watcher thread is needed;
+        otherwise falls back to the watchdog observer thread.
+        """
+        if not HAS_WATCHFILES:
+            self.start_hot_reload()
+            return
+        
+        if not self.config_file_path.exists():
+            self.logger.warning(f"Configuration file {self.config_file_path} does not exist")
+            return
+        
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch_loop())
         
         self.logger.info(f"Started hot-reload for configuration file: {self.config_file_path}")
     
+    async def _watch_loop(self) -> None:
+        """Reload whenever watchfiles reports a change to the config file (already debounced).
+        
+        Reloads run in a worker thread, like the watchdog fallback, so file
+        I/O, the lock and change callbacks stay off the event loop.
+        """
+        target_path = self.config_file_path.resolve()
+        target = str(target_path)
+        try:
+            async for _changes in watchfiles.awatch(
+                target_path.parent,
+                watch_filter=lambda _change, path: path == target,
+                recursive=False
+            ):
+                await asyncio.to_thread(self._reload_from_file)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Configuration hot-reload stopped: {e}")
+    
     def stop_hot_reload(self) -> None:
         """Stop watching configuration file for changes."""
+        if self._watch_task is not None:
+            if not self._watch_task.done():
+                try:
+                    self._watch_task.cancel()
+                except RuntimeError:  # Event loop already closed
+                    pass
+            self._watch_task = None
         for observer in self._observers:
             observer.stop()
             observer.join()
         self._observers.clear()
+        for event_handler in self._file_handlers:
+            event_handler.cancel()
+        self._file_handlers.clear()
         self.logger.info("Stopped configuration hot-reload")
     
-    def add_change_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+    def add_change_callback(self, callback: Callable[[Mapping[str, Any]], None]) -> None:
         """Add callback to be called when configuration changes."""
         self._change_callbacks.append(callback)
     
@@ -131,30 +225,40 @@ class ConfigurationManager:
             self._reload_from_file()
         else:
             self.logger.info(f"Configuration file {self.config_file_path} not found, using defaults")
-            self._config_data = BuildConfiguration().to_dict()
-            self._rebuild_config()
+            self._publish(dict(BuildConfiguration().to_dict()))
             self._save_configuration()
     
     def _reload_from_file(self) -> bool:
         """Reload configuration from file."""
         try:
             with self._lock:
-                with open(self.config_file_path, 'r', encoding='utf-8') as f:
-                    new_config = json.load(f)
+                raw = self.config_file_path.read_bytes()
+                
+                # Unchanged content (e.g. our own save, repeated watcher events) is a no-op
+                digest = hashlib.blake2b(raw, digest_size=16).digest()
+                if digest == self._last_digest:
+                    return True
+                
+                new_config = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+                
+                # Reformatted file with the same values: remember it, but nothing changed
+                if new_config == self._snapshot:
+                    self._last_digest = digest
+                    return True
                 
                 # Validate new configuration
-                BuildConfiguration.from_dict(new_config)
+                new_build_config = BuildConfiguration.from_dict(new_config)
                 
-                old_config = self._config_data.copy()
-                self._config_data = new_config
-                self._rebuild_config()
+                self._build_config = new_build_config
+                self._snapshot = MappingProxyType(new_config)
+                self._last_digest = digest
                 
                 self.logger.info(f"Configuration reloaded from {self.config_file_path}")
                 
                 # Notify callbacks of configuration change
                 for callback in self._change_callbacks:
                     try:
-                        callback(self._config_data)
+                        callback(self._snapshot)
                     except Exception as e:
                         self.logger.error(f"Configuration change callback failed: {e}")
                 
@@ -167,13 +271,16 @@ class ConfigurationManager:
             self.logger.error(f"Failed to reload configuration: {e}")
             return False
     
-    def _rebuild_config(self) -> None:
-        """Rebuild typed configuration object."""
+    def _publish(self, config_data: Dict[str, Any]) -> None:
+        """Validate config_data and swap it in as the current snapshot."""
         try:
-            self._build_config = BuildConfiguration.from_dict(self._config_data)
+            build_config = BuildConfiguration.from_dict(config_data)
         except Exception as e:
             self.logger.error(f"Failed to rebuild configuration: {e}")
             raise ConfigurationError(f"Invalid configuration: {e}")
+        
+        self._build_config = build_config
+        self._snapshot = MappingProxyType(config_data)
     
     def _save_configuration(self) -> None:
         """Save current configuration to file."""
@@ -181,8 +288,12 @@ class ConfigurationManager:
             # Ensure directory exists
             self.config_file_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.config_file_path, 'w', encoding='utf-8') as f:
-                json.dump(self._config_data, f, indent=4)
+            if HAS_ORJSON:
+                raw = orjson.dumps(dict(self._snapshot), option=orjson.OPT_INDENT_2)
+            else:
+                raw = json.dumps(dict(self._snapshot), indent=4).encode('utf-8')
+            self.config_file_path.write_bytes(raw)
+            self._last_digest = hashlib.blake2b(raw, digest_size=16).digest()
             
             self.logger.info(f"Configuration saved to {self.config_file_path}")
             
@@ -2,9 +2,12 @@
 Error handler implementation with structured logging and fallback mechanisms.
 """
 
+import functools
+import inspect
+import logging
 import traceback
-from typing import Dict, Any, Optional, Callable
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Tuple
 
 from src.domain.interfaces.base import ILogger, IErrorHandler
 from src.domain.exceptions import (
@@ -14,17 +17,60 @@ from src.domain.exceptions import (
 )
 
 
+# User-facing messages by error type; the most specific class in the MRO wins
+_USER_MESSAGE_TEMPLATES: Dict[type, str] = {
+    ConfigurationError: "⚙️ 配置错误: {message}\n请检查配置文件设置。",
+    BuildExecutionError: "🔨 构建执行失败: {message}",
+    FileSystemError: "📁 文件系统错误: {message}\n请检查文件路径和权限。",
+    NetworkError: "🌐 网络错误: {message}\n请检查网络连接和端口设置。",
+    TaskQueueError: "📋 任务队列错误: {message}\n请稍后重试。",
+    AIServiceError: "🤖 AI服务错误: {message}\n将使用备用方案。",
+    ValidationError: "✅ 数据验证失败: {message}\n请检查输入参数。",
+    SecurityError: "🔒 安全错误: {message}\n操作已被阻止。",
+    ProcessError: "⚡ 进程错误: {message}\n请检查系统资源。",
+    BuildSystemError: "❌ 系统错误: {message}",
+    BaseException: "❌ 未知错误: {message}\n请联系管理员。",
+}
+
+# Optional per-type suffixes appended after the template
+_USER_MESSAGE_EXTRAS: Dict[type, Callable[[Exception], str]] = {
+    BuildExecutionError: lambda error: f"\n返回码: {error.return_code}" if error.return_code else "",
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _user_message_template(error_type: type) -> Tuple[str, Optional[Callable[[Exception], str]]]:
+    """Resolve the message template and suffix hook for an error type."""
+    for cls in error_type.__mro__:
+        template = _USER_MESSAGE_TEMPLATES.get(cls)
+        if template is not None:
+            return template, _USER_MESSAGE_EXTRAS.get(cls)
+    return _USER_MESSAGE_TEMPLATES[BaseException], None
+
+
+@dataclass(frozen=True, slots=True)
+class _FallbackHandler:
+    """Registered fallback handler, classified as sync or async once at registration."""
+    fn: Callable[[Exception, Dict[str, Any]], Any]
+    is_async: bool
+    
+    @classmethod
+    def wrap(cls, fn: Callable[[Exception, Dict[str, Any]], Any]) -> '_FallbackHandler':
+        return cls(fn, inspect.iscoroutinefunction(fn))
+
+
 class ErrorHandler:
     """Comprehensive error handler with logging and user-friendly messages."""
     
     def __init__(self, logger: ILogger):
         self.logger = logger
-        self._fallback_handlers: Dict[type, Callable[[Exception, Dict[str, Any]], str]] = {}
+        self._fallback_handlers: Dict[type, _FallbackHandler] = {}
+        self._resolved_handlers: Dict[type, Optional[_FallbackHandler]] = {}  # Concrete error type -> handler
         self._setup_default_handlers()
     
     def _setup_default_handlers(self) -> None:
         """Setup default fallback handlers for different error types."""
-        self._fallback_handlers.update({
+        defaults = {
             ConfigurationError: self._handle_configuration_error,
             BuildExecutionError: self._handle_build_execution_error,
             FileSystemError: self._handle_filesystem_error,
@@ -34,7 +80,10 @@ class ErrorHandler:
             ValidationError: self._handle_validation_error,
             SecurityError: self._handle_security_error,
             ProcessError: self._handle_process_error,
-        })
+        }
+        self._fallback_handlers.update(
+            (error_type, _FallbackHandler.wrap(fn)) for error_type, fn in defaults.items()
+        )
     
     async def handle_error(self, error: Exception, context: Dict[str, Any]) -> str:
         """Handle error with logging and return user-friendly message."""
@@ -51,11 +100,16 @@ class ErrorHandler:
     
     def log_error(self, error: Exception, context: Dict[str, Any]) -> None:
         """Log error with structured context."""
+        level, message = self._log_level_for(error)
+        
+        # Skip the traceback and context work when the record would be dropped
+        if not self.logger.is_enabled_for(level):
+            return
+        
         error_context = {
             'error_type': type(error).__name__,
             'error_message': str(error),
-            'traceback': traceback.format_exc(),
-            'timestamp': datetime.now().isoformat(),
+            'traceback': self._format_traceback(error),
             **context
         }
         
@@ -89,82 +143,87 @@ class ErrorHandler:
                 })
         
         # Log at appropriate level
+        if level == logging.CRITICAL:
+            self.logger.critical(message, **error_context)
+        elif level == logging.WARNING:
+            self.logger.warning(message, **error_context)
+        else:
+            self.logger.error(message, **error_context)
+    
+    @staticmethod
+    def _format_traceback(error: BaseException) -> str:
+        """Render the error's own traceback, once per traceback.
+        
+        The same exception is often logged by several layers, so the rendered
+        text is memoised on the exception itself (exceptions do not support
+        weak references) and only redone once it has propagated further.
+        """
+        tb = error.__traceback__
+        cached = getattr(error, '_rendered_traceback', None)
+        if cached is not None and cached[0] == id(tb):
+            return cached[1]
+        
+        rendered = ''.join(traceback.format_exception(error))
+        try:
+            error._rendered_traceback = (id(tb), rendered)
+        except AttributeError:  # Exception types without an instance __dict__
+            pass
+        return rendered
+    
+    @staticmethod
+    def _log_level_for(error: Exception) -> Tuple[int, str]:
+        """Pick the log level and message for an error."""
         if isinstance(error, (SecurityError, ProcessError)):
-            self.logger.critical("Critical error occurred", **error_context)
+            return logging.CRITICAL, "Critical error occurred"
         elif isinstance(error, (BuildExecutionError, NetworkError)):
-            self.logger.error("Execution error occurred", **error_context)
+            return logging.ERROR, "Execution error occurred"
         elif isinstance(error, (ConfigurationError, ValidationError)):
-            self.logger.warning("Configuration/validation error occurred", **error_context)
+            return logging.WARNING, "Configuration/validation error occurred"
         else:
-            self.logger.error("Unexpected error occurred", **error_context)
+            return logging.ERROR, "Unexpected error occurred"
     
     def create_user_message(self, error: Exception) -> str:
         """Create user-friendly error message."""
-        if isinstance(error, ConfigurationError):
-            return f"⚙️ 配置错误: {error.message}\n请检查配置文件设置。"
-        
-        elif isinstance(error, BuildExecutionError):
-            base_msg = f"🔨 构建执行失败: {error.message}"
-            if error.return_code:
-                base_msg += f"\n返回码: {error.return_code}"
-            return base_msg
-        
-        elif isinstance(error, FileSystemError):
-            return f"📁 文件系统错误: {error.message}\n请检查文件路径和权限。"
-        
-        elif isinstance(error, NetworkError):
-            return f"🌐 网络错误: {error.message}\n请检查网络连接和端口设置。"
-        
-        elif isinstance(error, TaskQueueError):
-            return f"📋 任务队列错误: {error.message}\n请稍后重试。"
-        
-        elif isinstance(error, AIServiceError):
-            return f"🤖 AI服务错误: {error.message}\n将使用备用方案。"
-        
-        elif isinstance(error, ValidationError):
-            return f"✅ 数据验证失败: {error.message}\n请检查输入参数。"
-        
-        elif isinstance(error, SecurityError):
-            return f"🔒 安全错误: {error.message}\n操作已被阻止。"
-        
-        elif isinstance(error, ProcessError):
-            return f"⚡ 进程错误: {error.message}\n请检查系统资源。"
-        
-        elif isinstance(error, BuildSystemError):
-            return f"❌ 系统错误: {error.message}"
-        
-        else:
-            return f"❌ 未知错误: {str(error)}\n请联系管理员。"
+        template, extra = _user_message_template(type(error))
+        message = error.message if isinstance(error, BuildSystemError) else str(error)
+        user_message = template.format(message=message)
+        return user_message + extra(error) if extra is not None else user_message
     
     async def _execute_fallback(self, error: Exception, context: Dict[str, Any]) -> None:
         """Execute fallback behavior for specific error types."""
-        error_type = type(error)
+        handler = self._resolve_fallback_handler(type(error))
+        if handler is None:
+            return
         
-        # Find the most specific handler
-        for exc_type, handler in self._fallback_handlers.items():
-            if isinstance(error, exc_type):
-                try:
-                    await self._safe_execute_handler(handler, error, context)
-                    break
-                except Exception as fallback_error:
-                    self.logger.error(
-                        "Fallback handler failed",
-                        error_type=type(fallback_error).__name__,
-                        error_message=str(fallback_error),
-                        original_error=str(error)
-                    )
-    
-    async def _safe_execute_handler(self, handler: Callable, error: Exception, context: Dict[str, Any]) -> None:
-        """Safely execute a fallback handler."""
         try:
-            if hasattr(handler, '__call__'):
-                result = handler(error, context)
-                # Handle async handlers
-                if hasattr(result, '__await__'):
-                    await result
-        except Exception as e:
+            if handler.is_async:
+                await handler.fn(error, context)
+            else:
+                handler.fn(error, context)
+        except Exception as fallback_error:
             # Log but don't re-raise to prevent cascading failures
-            self.logger.error(f"Fallback handler execution failed: {e}")
+            self.logger.error(
+                "Fallback handler failed",
+                error_type=type(fallback_error).__name__,
+                error_message=str(fallback_error),
+                original_error=str(error)
+            )
+    
+    def _resolve_fallback_handler(self, error_type: type) -> Optional[_FallbackHandler]:
+        """Find the most specific handler by walking the error type's MRO (memoised per type)."""
+        try:
+            return self._resolved_handlers[error_type]
+        except KeyError:
+            pass
+        
+        handler = None
+        for cls in error_type.__mro__:
+            handler = self._fallback_handlers.get(cls)
+            if handler is not None:
+                break
+        
+        self._resolved_handlers[error_type] = handler
+        return handler
     
     # Specific fallback handlers
     
@@ -214,8 +273,10 @@ class ErrorHandler:
     
     def add_fallback_handler(self, error_type: type, handler: Callable[[Exception, Dict[str, Any]], None]) -> None:
         """Add custom fallback handler for specific error type."""
-        self._fallback_handlers[error_type] = handler
+        self._fallback_handlers[error_type] = _FallbackHandler.wrap(handler)
+        self._resolved_handlers.clear()
     
     def remove_fallback_handler(self, error_type: type) -> None:
         """Remove fallback handler for specific error type."""
-        self._fallback_handlers.pop(error_type, None)
\ No newline at end of file
+        self._fallback_handlers.pop(error_type, None)
+        self._resolved_handlers.clear()
\ No newline at end of file
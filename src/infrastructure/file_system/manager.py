@@ -2,11 +2,14 @@
 Secure file manager implementation with validation and locking.
 """
 
+import concurrent.futures
+import functools
 import os
 import shutil
 import tempfile
 import threading
 import asyncio
+from collections import OrderedDict
 from pathlib import Path
 from typing import Tuple, Optional, List, Dict, Any, Set
 import time
@@ -24,9 +27,67 @@ from src.domain.models.entities import BuildInfo, BuildType
 from src.domain.exceptions import FileSystemError, SecurityError
 
 
+# Characters rejected in branch names and paths
+_INVALID_BRANCH_CHARS = frozenset('<>:"|?*/\\\0')
+_INVALID_PATH_CHARS = frozenset('<>"|?*')
+
+# Reserved device names (Windows)
+_RESERVED_NAMES = frozenset(
+    ['CON', 'PRN', 'AUX', 'NUL']
+    + [f'COM{i}' for i in range(1, 10)]
+    + [f'LPT{i}' for i in range(1, 10)]
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _resolved_base(base_path: str) -> Path:
+    """Resolve a base directory once; configured roots do not change at runtime."""
+    return Path(base_path).resolve(strict=False)
+
+
+def _scan_dir(path: str, subdirs: List[str]) -> int:
+    """Sum regular file sizes directly in path, appending subdirectories to subdirs.
+    
+    Uses os.scandir so each entry's lstat comes from its DirEntry (free on
+    Windows, cached on POSIX) instead of a separate os.lstat call. Symlinks
+    are neither followed nor counted.
+    """
+    total_size = 0
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return 0  # Unreadable directory, as os.walk would skip it
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                entry_stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                # Skip files that can't be accessed
+                continue
+            if stat.S_ISREG(entry_stat.st_mode):  # Only regular files
+                total_size += entry_stat.st_size
+    return total_size
+
+
+def _tree_size(path: str) -> int:
+    """Sum the sizes of regular files under path."""
+    total_size = 0
+    pending = [path]
+    while pending:
+        total_size += _scan_dir(pending.pop(), pending)
+    return total_size
+
+
 class FileLock:
     """File locking implementation for concurrent access control."""
     
+    # Backoff bounds (seconds) between attempts when acquiring with a timeout
+    INITIAL_RETRY_DELAY = 0.001
+    MAX_RETRY_DELAY = 0.1
+    
     def __init__(self, file_path: str, logger: ILogger):
         self.file_path = Path(file_path)
         self.logger = logger
@@ -35,12 +96,12 @@ class FileLock:
     
     async def __aenter__(self):
         """Async context manager entry."""
-        await asyncio.get_event_loop().run_in_executor(None, self.acquire)
+        await asyncio.to_thread(self.acquire)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        await asyncio.get_event_loop().run_in_executor(None, self.release)
+        await asyncio.to_thread(self.release)
     
     def acquire(self, timeout: Optional[float] = None) -> bool:
         """Acquire the lock."""
@@ -59,18 +120,22 @@ class FileLock:
                     if timeout is None:
                         fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
                     else:
-                        # Non-blocking lock with timeout
-                        start_time = time.time()
-                        while time.time() - start_time < timeout:
+                        # Non-blocking lock with timeout; retries back off
+                        # exponentially so short waits resolve quickly
+                        deadline = time.monotonic() + timeout
+                        delay = self.INITIAL_RETRY_DELAY
+                        while True:
                             try:
                                 fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
                                 break
                             except BlockingIOError:
-                                time.sleep(0.1)
-                        else:
-                            self.lock_file.close()
-                            self.lock_file = None
-                            return False
+                                remaining = deadline - time.monotonic()
+                                if remaining <= 0:
+                                    self.lock_file.close()
+                                    self.lock_file = None
+                                    return False
+                                time.sleep(min(delay, remaining))
+                                delay = min(delay * 2, self.MAX_RETRY_DELAY)
                 else:
                     # Windows fallback - simple file-based locking
                     if lock_path.exists():
@@ -124,9 +189,23 @@ class SecureFileManager:
         self._temp_files: Set[str] = set()
         self._temp_lock = threading.Lock()
         
-        # Cache for directory sizes to improve performance
-        self._size_cache: Dict[str, Tuple[float, Tuple[str, int]]] = {}
+        # Cache for directory sizes to improve performance (LRU, keyed by path, checked against mtime)
+        self._size_cache: 'OrderedDict[str, Tuple[Optional[int], float, Tuple[str, int]]]' = OrderedDict()
+        self._size_cache_lock = threading.Lock()
         self._cache_ttl = 300  # 5 minutes
+        self._cache_maxsize = 1024
+        
+        # Worker threads for walking publish directory subtrees in parallel
+        self._walk_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1),
+            thread_name_prefix="dir-size"
+        )
+        # Separate pool for whole scans offloaded from the event loop; scans
+        # submit subtree walks to _walk_pool, so sharing it could deadlock
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2,
+            thread_name_prefix="fs-io"
+        )
     
     def get_branch_paths(self, branch: str) -> Tuple[str, str]:
         """Get bat directory and publish root for a branch."""
@@ -145,34 +224,39 @@ class SecureFileManager:
         
         return bat_dir, publish_root
     
-    def get_latest_build_info(self, root: str, after_timestamp: Optional[float] = None) -> Tuple[bool, BuildInfo, Optional[str]]:
+    def get_latest_build_info(self, root: str, after_timestamp: Optional[float] = None) -> Tuple[bool, Optional[BuildInfo], Optional[str]]:
         """Get information about the latest build in the specified root directory."""
         if not self.validate_path(root):
             raise SecurityError(f"Root path validation failed: {root}")
         
         if not os.path.exists(root):
-            return False, BuildInfo(path="", folder_name=""), None
+            return False, None, None
         
         try:
-            # Get subdirectories
-            subdirs = []
-            for item in os.listdir(root):
-                item_path = os.path.join(root, item)
-                if os.path.isdir(item_path):
-                    subdirs.append(item_path)
-            
-            if not subdirs:
-                return False, BuildInfo(path="", folder_name=""), None
+            # Find the latest subdirectory by modification time in one scandir pass
+            latest_dir = None
+            latest_name = ""
+            latest_mtime = 0.0
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    try:
+                        if not entry.is_dir():
+                            continue
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if latest_dir is None or mtime > latest_mtime:
+                        latest_dir, latest_name, latest_mtime = entry.path, entry.name, mtime
             
-            # Find latest by modification time
-            latest_dir = max(subdirs, key=os.path.getmtime)
+            if latest_dir is None:
+                return False, None, None
             
             # Check timestamp filter
-            if after_timestamp and os.path.getmtime(latest_dir) < (after_timestamp - 5):
-                return False, BuildInfo(path="", folder_name=""), None
+            if after_timestamp and latest_mtime < (after_timestamp - 5):
+                return False, None, None
             
             # Get directory info
-            folder_name = os.path.basename(latest_dir)
+            folder_name = latest_name
             size_str, size_bytes = self.get_dir_size(latest_dir)
             
             # Parse build info from folder name
@@ -187,36 +271,47 @@ class SecureFileManager:
             
         except Exception as e:
             self.logger.error(f"Error getting latest build info: {e}", root=root)
-            return False, BuildInfo(path="", folder_name=""), None
+            return False, None, None
+    
+    async def get_latest_build_info_async(self, root: str, after_timestamp: Optional[float] = None) -> Tuple[bool, Optional[BuildInfo], Optional[str]]:
+        """Run get_latest_build_info on the file I/O pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._io_pool, self.get_latest_build_info, root, after_timestamp
+        )
+    
+    async def get_dir_size_async(self, path: str) -> Tuple[str, int]:
+        """Run get_dir_size on the file I/O pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, self.get_dir_size, path)
     
     def get_dir_size(self, path: str) -> Tuple[str, int]:
-        """Get directory size with caching for performance."""
-        if not self.validate_path(path):
-            raise SecurityError(f"Path validation failed: {path}")
+        """Get directory size with caching for performance.
         
-        # Check cache first
+        Only validated paths are ever cached, so a cache hit skips validation.
+        """
+        # Check cache first; a changed directory mtime invalidates the entry
         cache_key = os.path.abspath(path)
-        current_time = time.time()
+        current_time = time.monotonic()
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except (OSError, ValueError):
+            mtime_ns = None
         
-        if cache_key in self._size_cache:
-            cache_time, cached_result = self._size_cache[cache_key]
-            if current_time - cache_time < self._cache_ttl:
-                return cached_result
+        with self._size_cache_lock:
+            entry = self._size_cache.get(cache_key)
+            if entry is not None:
+                cached_mtime_ns, cache_time, cached_result = entry
+                if cached_mtime_ns == mtime_ns and current_time - cache_time < self._cache_ttl:
+                    self._size_cache.move_to_end(cache_key)
+                    return cached_result
+        
+        if not self.validate_path(path):
+            raise SecurityError(f"Path validation failed: {path}")
         
         total_size = 0
         try:
-            # Use os.walk for efficient directory traversal
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    file_path = os.path.join(dirpath, filename)
-                    try:
-                        # Use lstat to avoid following symlinks
-                        file_stat = os.lstat(file_path)
-                        if stat.S_ISREG(file_stat.st_mode):  # Only regular files
-                            total_size += file_stat.st_size
-                    except (OSError, IOError):
-                        # Skip files that can't be accessed
-                        continue
+            total_size = self._parallel_tree_size(path)
         
         except Exception as e:
             self.logger.warning(f"Error calculating directory size: {e}", path=path)
@@ -232,10 +327,39 @@ class SecureFileManager:
         result = (size_str, total_size)
         
         # Update cache
-        self._size_cache[cache_key] = (current_time, result)
+        with self._size_cache_lock:
+            self._size_cache[cache_key] = (mtime_ns, current_time, result)
+            self._size_cache.move_to_end(cache_key)
+            while len(self._size_cache) > self._cache_maxsize:
+                self._size_cache.popitem(last=False)
         
         return result
     
+    def clear_size_cache(self) -> None:
+        """Drop all cached directory sizes."""
+        with self._size_cache_lock:
+            self._size_cache.clear()
+    
+    def _parallel_tree_size(self, path: str) -> int:
+        """Size a directory, walking its top-level subtrees concurrently.
+        
+        Traversal is bound on metadata syscalls, so separate subtrees keep
+        the disk (or network share) busy in parallel.
+        """
+        subdirs: List[str] = []
+        total_size = _scan_dir(path, subdirs)
+        if len(subdirs) < 2:
+            return total_size + sum(map(_tree_size, subdirs))
+        
+        try:
+            futures = [self._walk_pool.submit(_tree_size, subdir) for subdir in subdirs]
+        except RuntimeError:  # Pool already shut down
+            return total_size + sum(map(_tree_size, subdirs))
+        
+        for future in concurrent.futures.as_completed(futures):
+            total_size += future.result()
+        return total_size
+    
     def find_disk_log(self, path: str) -> Optional[str]:
         """Find build log file in the specified path."""
         if not self.validate_path(path):
@@ -260,29 +384,21 @@ class SecureFileManager:
             return None
     
     def validate_path(self, path: str, base_path: Optional[str] = None) -> bool:
-        """Validate path for security (prevent directory traversal)."""
+        """Validate path for security (prevent directory traversal).
+        
+        The path must resolve inside base_path, which defaults to the publish root.
+        """
         try:
-            # Convert to absolute path
-            abs_path = os.path.abspath(path)
-            
-            # Check for directory traversal attempts
-            if '..' in path or path.startswith('/') or ':' in path[1:3]:  # Windows drive check
-                return False
-            
-            # If base_path is provided, ensure path is within it
-            if base_path:
-                abs_base = os.path.abspath(base_path)
-                if not abs_path.startswith(abs_base):
-                    return False
-            
             # Check for invalid characters
-            invalid_chars = ['<', '>', '"', '|', '?', '*']
-            if any(char in path for char in invalid_chars):
+            if not _INVALID_PATH_CHARS.isdisjoint(path):
                 return False
             
+            # Resolving normalises '..' and symlinks, so containment is a single check
+            resolved = Path(path).resolve(strict=False)
+            resolved.relative_to(_resolved_base(base_path or self.config.publish_root_base))
             return True
             
-        except Exception:
+        except (ValueError, OSError, TypeError):
             return False
     
     def create_secure_temp_file(self, suffix: str = "", prefix: str = "build_") -> str:
@@ -306,15 +422,30 @@ class SecureFileManager:
     
     def cleanup_temp_files(self) -> None:
         """Clean up temporary files created by this manager."""
+        # Take ownership of the pending set so the lock is not held during unlinks
         with self._temp_lock:
-            for temp_file in self._temp_files.copy():
-                try:
-                    if os.path.exists(temp_file):
-                        os.unlink(temp_file)
-                    self._temp_files.remove(temp_file)
-                    self.logger.debug(f"Cleaned up temp file: {temp_file}")
-                except Exception as e:
-                    self.logger.warning(f"Failed to cleanup temp file {temp_file}: {e}")
+            pending, self._temp_files = self._temp_files, set()
+        
+        failed: Set[str] = set()
+        for temp_file in pending:
+            try:
+                os.unlink(temp_file)
+                self.logger.debug(f"Cleaned up temp file: {temp_file}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                failed.add(temp_file)
+                self.logger.warning(f"Failed to cleanup temp file {temp_file}: {e}")
+        
+        if failed:
+            # Keep failures tracked for the next cleanup attempt
+            with self._temp_lock:
+                self._temp_files |= failed
+    
+    def shutdown(self) -> None:
+        """Stop the file I/O and directory walk worker threads."""
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        self._walk_pool.shutdown(wait=False, cancel_futures=True)
     
     def create_file_lock(self, file_path: str) -> IFileLock:
         """Create a file lock for the specified path."""
@@ -330,15 +461,11 @@ class SecureFileManager:
             return False
         
         # Check for invalid characters
-        invalid_chars = ['<', '>', ':', '"', '|', '?', '*', '/', '\\', '\0']
-        if any(char in branch for char in invalid_chars):
+        if not _INVALID_BRANCH_CHARS.isdisjoint(branch):
             return False
         
         # Check for reserved names (Windows)
-        reserved_names = ['CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'COM4', 
-                         'COM5', 'COM6', 'COM7', 'COM8', 'COM9', 'LPT1', 'LPT2', 
-                         'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9']
-        if branch.upper() in reserved_names:
+        if branch.upper() in _RESERVED_NAMES:
             return False
         
         return True
@@ -347,5 +474,6 @@ class SecureFileManager:
         """Cleanup on destruction."""
         try:
             self.cleanup_temp_files()
+            self.shutdown()
         except Exception:
             pass  # Ignore errors during cleanup
\ No newline at end of file
@@ -3,16 +3,64 @@ Structured logging implementation.
 """
 
 import logging
+import logging.handlers
 import json
+import queue
 from datetime import datetime
 from typing import Any, Dict, Optional
 from pathlib import Path
 
 from src.domain.interfaces.base import ILogger
 
+# Optional orjson import (faster log record serialisation)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recent timestamp rendered
+_ts_second: tuple = (None, "")
+
+
+def _iso_timestamp(now: float) -> str:
+    """Render a local ISO-8601 timestamp, reusing the date/time part within the same second."""
+    global _ts_second
+    second = int(now)
+    cached_second, prefix = _ts_second
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second).isoformat()
+        _ts_second = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+    
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: hand the record over unformatted so StructuredFormatter sees exc_info
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 class StructuredLogger:
-    """Structured logger implementation with JSON formatting."""
+    """Structured logger implementation with JSON formatting.
+    
+    Records are formatted and written by a background listener thread, so
+    logging never blocks the caller (or the event loop) on console/file I/O.
+    """
+    
+    QUEUE_SIZE = 10_000
     
     def __init__(self, name: str, level: str = "INFO", log_file: Optional[str] = None):
         self.logger = logging.getLogger(name)
@@ -27,7 +75,7 @@ class StructuredLogger:
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        handlers = [console_handler]
         
         # File handler if specified
         if log_file:
@@ -36,38 +84,74 @@ class StructuredLogger:
             
             file_handler = logging.FileHandler(log_file, encoding='utf-8')
             file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
+        
+        # Callers only enqueue; the listener thread drives the real handlers
+        self._queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=self.QUEUE_SIZE))
+        self.logger.addHandler(self._queue_handler)
+        self._listener: Optional[logging.handlers.QueueListener] = logging.handlers.QueueListener(
+            self._queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        self._listener.start()
     
-    def debug(self, message: str, **kwargs: Any) -> None:
+    @property
+    def dropped_records(self) -> int:
+        """Number of records discarded because the log queue was full."""
+        return self._queue_handler.dropped
+    
+    def close(self) -> None:
+        """Flush queued records and stop the listener thread.
+        
+        Later records are written synchronously by the underlying handlers.
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            self.logger.removeHandler(self._queue_handler)
+            for handler in self._listener.handlers:
+                self.logger.addHandler(handler)
+            self._listener = None
+    
+    def debug(self, message: str, *args: Any, **kwargs: Any) -> None:
         """Log debug message with context."""
-        self._log(logging.DEBUG, message, kwargs)
+        self._log(logging.DEBUG, message, args, kwargs)
     
-    def info(self, message: str, **kwargs: Any) -> None:
+    def info(self, message: str, *args: Any, **kwargs: Any) -> None:
         """Log info message with context."""
-        self._log(logging.INFO, message, kwargs)
+        self._log(logging.INFO, message, args, kwargs)
     
-    def warning(self, message: str, **kwargs: Any) -> None:
+    def warning(self, message: str, *args: Any, **kwargs: Any) -> None:
         """Log warning message with context."""
-        self._log(logging.WARNING, message, kwargs)
+        self._log(logging.WARNING, message, args, kwargs)
     
-    def error(self, message: str, **kwargs: Any) -> None:
+    def error(self, message: str, *args: Any, **kwargs: Any) -> None:
         """Log error message with context."""
-        self._log(logging.ERROR, message, kwargs)
+        self._log(logging.ERROR, message, args, kwargs)
     
-    def critical(self, message: str, **kwargs: Any) -> None:
+    def critical(self, message: str, *args: Any, **kwargs: Any) -> None:
         """Log critical message with context."""
-        self._log(logging.CRITICAL, message, kwargs)
+        self._log(logging.CRITICAL, message, args, kwargs)
+    
+    def is_enabled_for(self, level: int) -> bool:
+        """Check whether a record at level would be emitted."""
+        return self.logger.isEnabledFor(level)
     
-    def _log(self, level: int, message: str, context: Dict[str, Any]) -> None:
-        """Internal logging method with context."""
-        # Create structured log record
+    def _log(self, level: int, message: str, args: tuple, context: Dict[str, Any]) -> None:
+        """Internal logging method with context.
+        
+        Positional ``args`` are %-formatted into ``message`` only when the
+        record is actually emitted.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        
+        # Create structured log record; the timestamp is rendered from
+        # record.created at format time, on the listener thread
         extra = {
             'context': context,
-            'timestamp': datetime.now().isoformat(),
             'component': context.get('component', 'unknown')
         }
         
-        self.logger.log(level, message, extra=extra)
+        self.logger.log(level, message, *args, extra=extra)
 
 
 class StructuredFormatter(logging.Formatter):
@@ -76,7 +160,7 @@ class StructuredFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data = {
-            'timestamp': getattr(record, 'timestamp', datetime.now().isoformat()),
+            'timestamp': _iso_timestamp(record.created),
             'level': record.levelname,
             'component': getattr(record, 'component', 'unknown'),
             'message': record.getMessage(),
@@ -92,6 +176,8 @@ class StructuredFormatter(logging.Formatter):
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
         
+        if HAS_ORJSON:
+            return orjson.dumps(log_data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
         return json.dumps(log_data, ensure_ascii=False)
 
 
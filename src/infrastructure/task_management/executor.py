@@ -3,7 +3,11 @@ Task executor implementation with process management.
 """
 
 import asyncio
+import codecs
+import re
 import subprocess
+import sys
+from collections import deque
 from typing import Optional, Callable, Awaitable, Dict, Any
 from datetime import datetime
 
@@ -13,6 +17,26 @@ from src.domain.models.entities import BuildTask, TaskStatus, ProgressUpdate
 from src.domain.exceptions import ProcessError, TaskQueueError
 
 
+# Console code page of the build scripts (Chinese Windows emits GBK)
+CONSOLE_ENCODING = 'gbk' if sys.platform == 'win32' else 'utf-8'
+
+# Progress stages (build output marker, user-facing message), in build order
+_STAGES: tuple[tuple[str, str], ...] = (
+    ("Running AutomationTool...", "⚙️ Init UAT"),
+    ("Command: BuildCookRun", "🏗️ Start Build"),
+    ("Cook: ", "🍳 Cooking..."),
+    ("Stage: ", "📦 Staging..."),
+    ("Package: ", "🚚 Packaging..."),
+    ("BUILD SUCCESSFUL", "✅ Finalizing..."),
+)
+
+# All stage markers in one lookahead alternation, one group per stage, so each
+# line is scanned once and a match's lastindex - 1 is its index in _STAGES
+# (also its bit in the fired-stage bitmask). No marker is a prefix of another,
+# so at most one stage can match at any position.
+_STAGE_RE = re.compile('(?=' + '|'.join(f'({re.escape(trigger)})' for trigger, _ in _STAGES) + ')')
+
+
 class TaskExecutor:
     """Task executor with process management and progress tracking."""
     
@@ -25,8 +49,10 @@ class TaskExecutor:
         self._progress_callbacks: list[Callable[[ProgressUpdate], Awaitable[None]]] = []
         
         # Process execution settings
-        self._process_timeout = 5.0  # seconds for readline timeout
+        self._process_timeout = 5.0  # seconds for read timeout
+        self._read_chunk_size = 65536
         self._max_log_lines = 10000
+        self._max_line_length = 65536  # chars kept of an unterminated line
     
     async def execute_task(self, task: BuildTask) -> None:
         """Execute a single task."""
@@ -90,11 +116,14 @@ class TaskExecutor:
             if self._current_process.returncode is None:
                 try:
                     # Use taskkill to terminate process tree on Windows
-                    subprocess.run(
-                        f"taskkill /F /T /PID {self._current_process.pid}",
-                        shell=True,
-                        check=False
+                    # (spawned without a shell so the event loop is never blocked)
+                    killer = await asyncio.create_subprocess_exec(
+                        "taskkill", "/F", "/T", "/PID", str(self._current_process.pid),
+                        stdin=asyncio.subprocess.DEVNULL,
+                        stdout=asyncio.subprocess.DEVNULL,
+                        stderr=asyncio.subprocess.DEVNULL
                     )
+                    await killer.wait()
                 except Exception as e:
                     self.logger.warning(f"Failed to use taskkill: {e}")
                     # Fallback to process.terminate()
@@ -152,15 +181,15 @@ class TaskExecutor:
         if task.strategy.value == "special" and task.arg3:
             cmd.append(task.arg3)
         
-        # Convert to command string for Windows
+        # Command string is only used for logging and error reporting
         cmd_str = subprocess.list2cmdline(cmd)
         
         self.logger.info(f"Executing command: {cmd_str}", task_id=task.task_id)
         
-        # Start process
+        # Start process (batch files run through cmd.exe directly, no extra shell level)
         try:
-            self._current_process = await asyncio.create_subprocess_shell(
-                cmd_str,
+            self._current_process = await asyncio.create_subprocess_exec(
+                "cmd.exe", "/c", *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.STDOUT,
                 cwd=task.bat_dir
@@ -176,18 +205,44 @@ class TaskExecutor:
         if not self._current_process:
             raise ProcessError("No process to run")
         
-        # Progress stage mapping
-        stages = {
-            "Running AutomationTool...": "⚙️ Init UAT",
-            "Command: BuildCookRun": "🏗️ Start Build",
-            "Cook: ": "🍳 Cooking...",
-            "Stage: ": "📦 Staging...",
-            "Package: ": "🚚 Packaging...",
-            "BUILD SUCCESSFUL": "✅ Finalizing..."
-        }
+        triggered_mask = 0
+        # Only the tail of the log is kept; memory stays bounded for long builds
+        log_lines: deque[str] = deque(maxlen=self._max_log_lines)
+        # Output is decoded chunk by chunk; the incremental decoder keeps
+        # multi-byte characters split across reads intact
+        decoder = codecs.getincrementaldecoder(CONSOLE_ENCODING)(errors='ignore')
+        # Trailing partial line carried over between reads
+        pending = ""
         
-        triggered_stages = set()
-        log_lines = []
+        async def handle_line(line: str) -> None:
+            nonlocal triggered_mask
+            line_str = line.strip()
+            
+            if not line_str:
+                return
+            
+            # Store log line (oldest lines are dropped past the limit)
+            log_lines.append(line_str)
+            
+            # Check for progress stages; the first unfired stage in build
+            # order wins, wherever it appears in the line
+            idx = min(
+                (match.lastindex - 1 for match in _STAGE_RE.finditer(line_str)
+                 if not triggered_mask & (1 << (match.lastindex - 1))),
+                default=None
+            )
+            if idx is not None:
+                triggered_mask |= 1 << idx
+                trigger, message = _STAGES[idx]
+                
+                # Send progress update
+                progress = ProgressUpdate(
+                    task_id=task.task_id,
+                    stage=trigger,
+                    message=message
+                )
+                
+                await self._notify_progress(progress)
         
         try:
             while True:
@@ -195,9 +250,10 @@ class TaskExecutor:
                     break
                 
                 try:
-                    # Read line with timeout
-                    line = await asyncio.wait_for(
-                        self._current_process.stdout.readline(),
+                    # Read whatever output is available in one batch; the
+                    # timeout is armed once per chunk rather than per line
+                    chunk = await asyncio.wait_for(
+                        self._current_process.stdout.read(self._read_chunk_size),
                         timeout=self._process_timeout
                     )
                 except asyncio.TimeoutError:
@@ -206,36 +262,20 @@ class TaskExecutor:
                         break
                     continue
                 
-                if not line:
+                if not chunk:
                     break
                 
-                # Decode line
-                try:
-                    line_str = line.decode('gbk', errors='ignore').strip()
-                except UnicodeDecodeError:
-                    line_str = line.decode('utf-8', errors='ignore').strip()
-                
-                if not line_str:
-                    continue
-                
-                # Store log line (with limit)
-                if len(log_lines) < self._max_log_lines:
-                    log_lines.append(line_str)
-                
-                # Check for progress stages
-                for trigger, message in stages.items():
-                    if trigger in line_str and trigger not in triggered_stages:
-                        triggered_stages.add(trigger)
-                        
-                        # Send progress update
-                        progress = ProgressUpdate(
-                            task_id=task.task_id,
-                            stage=trigger,
-                            message=message
-                        )
-                        
-                        await self._notify_progress(progress)
-                        break
+                lines = (pending + decoder.decode(chunk)).split('\n')
+                # Output without newlines (e.g. '\r' progress bars) would grow
+                # the partial line forever; keep only its most recent tail
+                pending = lines.pop()[-self._max_line_length:]
+                for line in lines:
+                    await handle_line(line)
+            
+            # Flush an unterminated last line, whichever way the loop ended
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                await handle_line(pending)
             
             # Wait for process completion
             await self._current_process.wait()
@@ -5,7 +5,7 @@ Thread-safe task queue implementation with priority support.
 import asyncio
 import threading
 import json
-from typing import Optional, List, Dict, Any, Callable, Awaitable
+from typing import Optional, List, Deque, Dict, Any, Callable, Awaitable
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -16,6 +16,13 @@ from src.domain.interfaces.task_queue import ITaskQueue, QueuePriority
 from src.domain.models.entities import BuildTask, TaskStatus
 from src.domain.exceptions import TaskQueueError
 
+# Optional orjson import (faster queue persistence)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 @dataclass
 class QueuedTask:
@@ -23,14 +30,10 @@ class QueuedTask:
     task: BuildTask
     priority: QueuePriority
     queued_at: datetime = field(default_factory=datetime.now)
-    
-    def __lt__(self, other: 'QueuedTask') -> bool:
-        """Compare tasks for priority queue ordering."""
-        # Higher priority value = higher priority
-        if self.priority.value != other.priority.value:
-            return self.priority.value > other.priority.value
-        # Same priority, use FIFO (earlier queued_at = higher priority)
-        return self.queued_at < other.queued_at
+
+
+# Buckets are drained from the most to the least urgent priority
+_PRIORITY_ORDER = tuple(sorted(QueuePriority, key=lambda p: p.value, reverse=True))
 
 
 class ThreadSafeTaskQueue:
@@ -40,8 +43,9 @@ class ThreadSafeTaskQueue:
         self.logger = logger
         self.persistence_file = Path(persistence_file) if persistence_file else None
         
-        # Thread-safe queue using asyncio primitives
-        self._queue: asyncio.PriorityQueue[QueuedTask] = asyncio.PriorityQueue()
+        # One FIFO deque per priority, guarded by an asyncio lock. Entries removed
+        # from _task_lookup are tombstones and are discarded lazily when reached.
+        self._buckets: Dict[QueuePriority, Deque[QueuedTask]] = {p: deque() for p in _PRIORITY_ORDER}
         self._task_lookup: Dict[str, QueuedTask] = {}
         self._lock = asyncio.Lock()
         
@@ -68,7 +72,7 @@ class ThreadSafeTaskQueue:
                 task.status = TaskStatus.QUEUED
                 
                 # Add to queue and lookup
-                await self._queue.put(queued_task)
+                self._buckets[priority].append(queued_task)
                 self._task_lookup[task.task_id] = queued_task
                 self._total_enqueued += 1
                 
@@ -78,7 +82,7 @@ class ThreadSafeTaskQueue:
                     branch=task.branch,
                     strategy=task.strategy.value,
                     priority=priority.name,
-                    queue_size=self._queue.qsize()
+                    queue_size=len(self._task_lookup)
                 )
                 
                 # Persist queue state
@@ -94,21 +98,17 @@ class ThreadSafeTaskQueue:
         """Remove and return next task from queue."""
         try:
             async with self._lock:
-                if self._queue.empty():
+                # Get highest priority task, skipping entries cancelled while queued
+                queued_task = self._pop_next()
+                if queued_task is None:
                     return None
-                
-                # Get highest priority task
-                queued_task = await self._queue.get()
-                
-                # Remove from lookup
-                self._task_lookup.pop(queued_task.task.task_id, None)
                 self._total_dequeued += 1
                 
                 self.logger.info(
                     f"Task dequeued: {queued_task.task.task_id}",
                     task_id=queued_task.task.task_id,
                     wait_time=(datetime.now() - queued_task.queued_at).total_seconds(),
-                    queue_size=self._queue.qsize()
+                    queue_size=len(self._task_lookup)
                 )
                 
                 # Persist queue state
@@ -124,29 +124,11 @@ class ThreadSafeTaskQueue:
         """Get next task without removing it from queue."""
         try:
             async with self._lock:
-                if self._queue.empty():
-                    return None
-                
-                # Create a temporary copy to peek
-                temp_queue = asyncio.PriorityQueue()
-                next_task = None
-                
-                # Move all items to temp queue to find the next one
-                items = []
-                while not self._queue.empty():
-                    item = await self._queue.get()
-                    items.append(item)
-                
-                if items:
-                    # Sort to find highest priority
-                    items.sort()
-                    next_task = items[0].task
-                    
-                    # Put all items back
-                    for item in items:
-                        await self._queue.put(item)
-                
-                return next_task
+                for bucket in self._buckets.values():
+                    self._discard_cancelled_head(bucket)
+                    if bucket:
+                        return bucket[0].task
+                return None
                 
         except Exception as e:
             self.logger.error(f"Failed to peek queue: {e}")
@@ -154,7 +136,7 @@ class ThreadSafeTaskQueue:
     
     async def get_queue_size(self) -> int:
         """Get current queue size."""
-        return self._queue.qsize()
+        return len(self._task_lookup)
     
     async def get_queue_status(self) -> Dict[str, Any]:
         """Get detailed queue status information."""
@@ -171,7 +153,7 @@ class ThreadSafeTaskQueue:
                 tasks_by_branch[branch] = tasks_by_branch.get(branch, 0) + 1
             
             return {
-                'total_size': self._queue.qsize(),
+                'total_size': len(self._task_lookup),
                 'tasks_by_priority': tasks_by_priority,
                 'tasks_by_branch': tasks_by_branch,
                 'total_enqueued': self._total_enqueued,
@@ -207,16 +189,15 @@ class ThreadSafeTaskQueue:
         """Clear all tasks from queue and return count of removed tasks."""
         try:
             async with self._lock:
-                count = self._queue.qsize()
+                count = len(self._task_lookup)
                 
                 # Cancel all tasks
                 for queued_task in self._task_lookup.values():
                     queued_task.task.cancel_execution("Queue cleared")
                 
                 # Clear queue and lookup
-                while not self._queue.empty():
-                    await self._queue.get()
-                
+                for bucket in self._buckets.values():
+                    bucket.clear()
                 self._task_lookup.clear()
                 
                 self.logger.info(f"Queue cleared: {count} tasks removed")
@@ -239,14 +220,14 @@ class ThreadSafeTaskQueue:
                 
                 target_task = self._task_lookup[task_id]
                 
-                # Get all tasks and sort by priority
-                all_tasks = list(self._task_lookup.values())
-                all_tasks.sort()
-                
-                # Find position
-                for i, queued_task in enumerate(all_tasks, 1):
-                    if queued_task.task.task_id == task_id:
-                        return i
+                # Buckets are already in dequeue order; count live entries ahead
+                position = 0
+                for bucket in self._buckets.values():
+                    for queued_task in bucket:
+                        if queued_task is target_task:
+                            return position + 1
+                        if self._is_live(queued_task):
+                            position += 1
                 
                 return None
                 
@@ -254,6 +235,24 @@ class ThreadSafeTaskQueue:
             self.logger.error(f"Failed to get task position: {e}", task_id=task_id)
             return None
     
+    def _is_live(self, queued_task: QueuedTask) -> bool:
+        """Check that an entry has not been cancelled or cleared."""
+        return self._task_lookup.get(queued_task.task.task_id) is queued_task
+    
+    def _discard_cancelled_head(self, bucket: Deque[QueuedTask]) -> None:
+        """Drop tombstoned entries until the bucket head is a live task."""
+        while bucket and not self._is_live(bucket[0]):
+            bucket.popleft()
+    
+    def _pop_next(self) -> Optional[QueuedTask]:
+        """Remove and return the next live entry across priority buckets."""
+        for bucket in self._buckets.values():
+            while bucket:
+                queued_task = bucket.popleft()
+                if self._task_lookup.pop(queued_task.task.task_id, None) is queued_task:
+                    return queued_task
+        return None
+    
     def _get_oldest_task_age(self) -> Optional[float]:
         """Get age of oldest task in seconds."""
         if not self._task_lookup:
@@ -288,8 +287,11 @@ class ThreadSafeTaskQueue:
             self.persistence_file.parent.mkdir(parents=True, exist_ok=True)
             
             # Write to file
-            with open(self.persistence_file, 'w', encoding='utf-8') as f:
-                json.dump(queue_data, f, indent=2)
+            if HAS_ORJSON:
+                data = orjson.dumps(queue_data, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(queue_data, indent=2).encode('utf-8')
+            self.persistence_file.write_bytes(data)
                 
         except Exception as e:
             self.logger.warning(f"Failed to persist queue: {e}")
@@ -300,16 +302,17 @@ class ThreadSafeTaskQueue:
             return
         
         try:
-            with open(self.persistence_file, 'r', encoding='utf-8') as f:
-                queue_data = json.load(f)
+            data = self.persistence_file.read_bytes()
+            queue_data = orjson.loads(data) if HAS_ORJSON else json.loads(data)
             
             # Restore statistics
             stats = queue_data.get('statistics', {})
             self._total_enqueued = stats.get('total_enqueued', 0)
             self._total_dequeued = stats.get('total_dequeued', 0)
             
-            # Restore tasks
-            for task_data in queue_data.get('tasks', []):
+            # Restore tasks in their original queue order
+            tasks = sorted(queue_data.get('tasks', []), key=lambda data: data.get('queued_at', ''))
+            for task_data in tasks:
                 try:
                     task = BuildTask.from_dict(task_data['task'])
                     priority = QueuePriority[task_data['priority']]
@@ -328,23 +331,10 @@ class ThreadSafeTaskQueue:
                     self.logger.warning(f"Failed to restore task: {e}")
             
             # Rebuild priority queue
-            asyncio.create_task(self._rebuild_priority_queue())
+            for queued_task in self._task_lookup.values():
+                self._buckets[queued_task.priority].append(queued_task)
             
             self.logger.info(f"Loaded {len(self._task_lookup)} persisted tasks")
             
         except Exception as e:
             self.logger.warning(f"Failed to load persisted tasks: {e}")
-    
-    async def _rebuild_priority_queue(self) -> None:
-        """Rebuild priority queue from task lookup."""
-        try:
-            # Clear current queue
-            while not self._queue.empty():
-                await self._queue.get()
-            
-            # Re-add all tasks
-            for queued_task in self._task_lookup.values():
-                await self._queue.put(queued_task)
-                
-        except Exception as e:
-            self.logger.error(f"Failed to rebuild priority queue: {e}")
\ No newline at end of file
@@ -30,6 +30,8 @@ def mock_logger():
     logger.warning = Mock()
     logger.error = Mock()
     logger.critical = Mock()
+    logger.is_enabled_for = Mock(return_value=True)
+    logger.close = Mock()
     return logger
 
 
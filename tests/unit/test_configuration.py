@@ -47,6 +47,9 @@ class TestBuildConfiguration:
         
         with pytest.raises(ValueError, match="disk_warn_threshold must be positive"):
             BuildConfiguration(disk_warn_threshold=-1)
+        
+        with pytest.raises(ValueError, match="ai_log_tail_bytes must be positive"):
+            BuildConfiguration(ai_log_tail_bytes=0)
     
     def test_configuration_validation_invalid_port(self):
         """Test configuration validation with invalid port."""
@@ -56,6 +59,25 @@ class TestBuildConfiguration:
         with pytest.raises(ValueError, match="web_port must be between 1 and 65535"):
             BuildConfiguration(web_port=70000)
     
+    def test_equal_configurations_share_hash(self):
+        """Test value-object equality and hashing."""
+        config = BuildConfiguration()
+        same = BuildConfiguration()
+        assert config == same
+        assert hash(config) == hash(same) == hash(config)
+        assert config != BuildConfiguration(web_port=9000)
+    
+    def test_env_port_override_is_converted_in_from_dict(self, monkeypatch):
+        """Test BUILD_WEB_PORT is parsed when the configuration is built."""
+        from src.domain.models import configuration
+        
+        monkeypatch.setitem(configuration._ENV_OVERRIDES, 'web_port', '9100')
+        assert BuildConfiguration.from_dict({}).web_port == 9100
+        
+        monkeypatch.setitem(configuration._ENV_OVERRIDES, 'web_port', 'abc')
+        with pytest.raises(ValueError):
+            BuildConfiguration.from_dict({})
+    
     def test_from_dict_creates_valid_configuration(self, sample_config_dict):
         """Test creating configuration from dictionary."""
         config = BuildConfiguration.from_dict(sample_config_dict)
@@ -90,6 +112,29 @@ class TestScriptConfiguration:
         
         message = config.get_progress_message("Some random log line")
         assert message is None
+    
+    def test_progress_message_prefers_stage_order(self):
+        """Test the earliest stage wins when a line contains several triggers."""
+        assert ScriptConfiguration().get_progress_message("Package: Cook: foo") == "🍳 Cooking..."
+        
+        config = ScriptConfiguration(progress_stages={"Done": "A", "Cook": "B"})
+        assert config.get_progress_message("Cook Done") == "A"
+    
+    def test_default_progress_stages_are_exposed(self):
+        """Test default instances expose the shared read-only stage map."""
+        config = ScriptConfiguration()
+        
+        assert config.progress_stages["Cook: "] == "🍳 Cooking..."
+        assert config.progress_stages is ScriptConfiguration().progress_stages
+        with pytest.raises(TypeError):
+            config.progress_stages["Cook: "] = "changed"
+    
+    def test_progress_stage_overrides(self):
+        """Test custom progress stages replace the defaults."""
+        config = ScriptConfiguration(progress_stages={"Compiling": "🔨 Compiling..."})
+        
+        assert config.get_progress_message("Compiling shaders") == "🔨 Compiling..."
+        assert config.get_progress_message("Cook: Map") is None
 
 
 class TestConfigurationManager:
@@ -130,6 +175,33 @@ class TestConfigurationManager:
         manager.set('web_port', 'invalid_port')
         assert manager.validate() is False
     
+    def test_reload_skips_unchanged_file(self, temp_dir, mock_logger, sample_config_dict):
+        """Test reloading byte-identical content does not notify callbacks."""
+        config_file = temp_dir / "config.json"
+        with open(config_file, 'w') as f:
+            json.dump(sample_config_dict, f)
+        
+        manager = ConfigurationManager(str(config_file), mock_logger)
+        changes = []
+        manager.add_change_callback(changes.append)
+        
+        assert manager.reload() is True
+        assert changes == []
+        
+        # Same values, different formatting
+        with open(config_file, 'w') as f:
+            json.dump(sample_config_dict, f, indent=8)
+        
+        assert manager.reload() is True
+        assert changes == []
+        
+        with open(config_file, 'w') as f:
+            json.dump({**sample_config_dict, 'web_port': 9090}, f)
+        
+        assert manager.reload() is True
+        assert len(changes) == 1
+        assert manager.get_build_config().web_port == 9090
+    
     def test_get_build_config_returns_typed_object(self, temp_dir, mock_logger):
         """Test getting typed build configuration object."""
         config_file = temp_dir / "config.json"
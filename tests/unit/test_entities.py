@@ -41,7 +41,8 @@ class TestBuildTask:
         assert task.strategy == BuildStrategy.SIMPLE
         assert task.status == TaskStatus.PENDING
         assert task.task_id is not None
-        assert isinstance(task.created_at, datetime)
+        assert task.task_id != BuildTask(branch="main", strategy=BuildStrategy.SIMPLE).task_id
+        assert isinstance(task.created_at, float)
     
     def test_build_task_validation_empty_branch(self):
         """Test BuildTask validation with empty branch."""
@@ -125,8 +126,8 @@ class TestBuildTask:
         assert task.get_duration() is None
         
         # Set times manually for testing
-        task.started_at = datetime(2023, 1, 1, 10, 0, 0)
-        task.completed_at = datetime(2023, 1, 1, 10, 5, 30)
+        task.started_at = datetime(2023, 1, 1, 10, 0, 0).timestamp()
+        task.completed_at = datetime(2023, 1, 1, 10, 5, 30).timestamp()
         
         duration = task.get_duration()
         assert duration == 330.0  # 5 minutes 30 seconds
@@ -164,6 +165,8 @@ class TestBuildTask:
         assert restored_task.strategy == original_task.strategy
         assert restored_task.arg3 == original_task.arg3
         assert restored_task.task_id == original_task.task_id
+        assert restored_task.created_at == pytest.approx(original_task.created_at, abs=1e-5)
+        assert restored_task.started_at is None
 
 
 class TestBuildInfo:
@@ -217,6 +220,31 @@ class TestBuildInfo:
         
         assert build_info.version == "1.0.0"
         assert build_info.build_type == BuildType.SHIPPING
+    
+    def test_build_info_parse_requires_whole_tokens(self):
+        """Test tags only match complete '_'-separated tokens."""
+        build_info = BuildInfo.parse_from_folder_name(
+            path="/test/path",
+            folder_name="20231201_version_2_Debugger",
+            size_str="1.0 GB",
+            size_bytes=1073741824
+        )
+        
+        assert build_info.ymd == "20231201"
+        assert build_info.version == "?"
+        assert build_info.build_type == BuildType.UNKNOWN
+    
+    def test_build_info_parse_trailing_tag_uses_defaults(self):
+        """Test a version tag without a value falls back to defaults."""
+        build_info = BuildInfo.parse_from_folder_name(
+            path="/test/path",
+            folder_name="20231201_Debug_ver",
+            size_str="1.0 GB",
+            size_bytes=1073741824
+        )
+        
+        assert build_info.version == "?"
+        assert build_info.build_type == BuildType.UNKNOWN
 
 
 class TestProgressUpdate:
@@ -233,7 +261,7 @@ class TestProgressUpdate:
         assert update.task_id == "test-task-123"
         assert update.stage == "building"
         assert update.message == "Compiling sources..."
-        assert isinstance(update.timestamp, datetime)
+        assert isinstance(update.timestamp, float)
     
     def test_progress_update_validation_empty_fields(self):
         """Test ProgressUpdate validation with empty fields."""
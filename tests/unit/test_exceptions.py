@@ -0,0 +1,45 @@
+"""
+Unit tests for domain exceptions.
+"""
+
+import pickle
+
+from src.domain.exceptions import (
+    BuildSystemError, BuildExecutionError, FileSystemError, ValidationError
+)
+
+
+class TestBuildSystemError:
+    """Test BuildSystemError behaviour."""
+    
+    def test_str_without_context(self):
+        """Test string form when no context is given."""
+        error = BuildSystemError("failed")
+        assert str(error) == "failed"
+        assert dict(error.context) == {}
+    
+    def test_str_with_context(self):
+        """Test string form includes context entries."""
+        error = BuildSystemError("failed", {"branch": "main"})
+        assert str(error) == "failed (Context: branch=main)"
+        assert error.context == {"branch": "main"}
+    
+    def test_pickle_round_trip_keeps_slot_attributes(self):
+        """Test that slotted attributes survive pickling."""
+        error = BuildExecutionError("build failed", return_code=2, context={"branch": "main"})
+        restored = pickle.loads(pickle.dumps(error))
+        
+        assert isinstance(restored, BuildExecutionError)
+        assert restored.message == "build failed"
+        assert restored.return_code == 2
+        assert restored.log_content is None
+        assert restored.context == {"branch": "main"}
+    
+    def test_subclass_attributes(self):
+        """Test subclass-specific attributes are stored."""
+        fs_error = FileSystemError("missing", file_path="a.txt")
+        validation_error = ValidationError("bad", field="branch", value="")
+        
+        assert fs_error.file_path == "a.txt"
+        assert validation_error.field == "branch"
+        assert validation_error.value == ""
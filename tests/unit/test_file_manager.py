@@ -0,0 +1,119 @@
+"""
+Unit tests for the secure file manager.
+"""
+
+import os
+
+import pytest
+
+from src.domain.models.configuration import BuildConfiguration
+from src.infrastructure.file_system.manager import SecureFileManager
+
+
+@pytest.fixture
+def file_manager(temp_dir, mock_logger):
+    """Create a file manager rooted in a temporary publish directory."""
+    config = BuildConfiguration(
+        workspace_root=str(temp_dir / "workspace"),
+        publish_root_base=str(temp_dir / "publish")
+    )
+    return SecureFileManager(config, mock_logger)
+
+
+class TestValidatePath:
+    """Test path traversal protection."""
+    
+    def test_path_inside_publish_root_is_valid(self, file_manager, temp_dir):
+        """Test absolute paths under the publish root are accepted."""
+        assert file_manager.validate_path(str(temp_dir / "publish" / "Lycoris_main" / "build"))
+    
+    def test_path_outside_base_is_rejected(self, file_manager, temp_dir):
+        """Test paths outside the base directory are rejected."""
+        assert not file_manager.validate_path(str(temp_dir / "elsewhere"))
+        assert not file_manager.validate_path(str(temp_dir / "publish" / ".." / "elsewhere"))
+    
+    def test_explicit_base_path(self, file_manager, temp_dir):
+        """Test validation against an explicit base directory."""
+        workspace = str(temp_dir / "workspace")
+        assert file_manager.validate_path(str(temp_dir / "workspace" / "main" / "bat"), workspace)
+        assert not file_manager.validate_path(str(temp_dir / "publish"), workspace)
+    
+    def test_invalid_characters_are_rejected(self, file_manager, temp_dir):
+        """Test paths with reserved characters are rejected."""
+        assert not file_manager.validate_path(str(temp_dir / "publish" / "a?b"))
+
+
+class TestDirSize:
+    """Test directory size calculation."""
+    
+    def test_dir_size_sums_nested_regular_files(self, file_manager, temp_dir):
+        """Test files in every subtree are counted exactly once."""
+        build_dir = temp_dir / "publish" / "Lycoris_main" / "20231201_main_1.0.0"
+        for index, subdir in enumerate(["", "a", "a/b", "c", "d/e/f"]):
+            target = build_dir / subdir
+            target.mkdir(parents=True, exist_ok=True)
+            (target / f"file{index}.bin").write_bytes(b"x" * (1024 * (index + 1)))
+        
+        size_str, size_bytes = file_manager.get_dir_size(str(build_dir))
+        
+        assert size_bytes == 1024 * (1 + 2 + 3 + 4 + 5)
+        assert size_str == "0.01 MB"
+    
+    def test_dir_size_ignores_symlinks(self, file_manager, temp_dir):
+        """Test symlinked files and directories are not followed."""
+        build_dir = temp_dir / "publish" / "Lycoris_main" / "build"
+        (build_dir / "real").mkdir(parents=True)
+        (build_dir / "real" / "data.bin").write_bytes(b"x" * 100)
+        try:
+            (build_dir / "link_dir").symlink_to(build_dir / "real", target_is_directory=True)
+            (build_dir / "link_file").symlink_to(build_dir / "real" / "data.bin")
+        except (OSError, NotImplementedError):
+            pytest.skip("Symlinks not supported")
+        
+        assert file_manager.get_dir_size(str(build_dir))[1] == 100
+    
+    def test_dir_size_cache_invalidated_by_directory_change(self, file_manager, temp_dir):
+        """Test adding an entry to the directory refreshes the cached size."""
+        build_dir = temp_dir / "publish" / "Lycoris_main" / "build"
+        build_dir.mkdir(parents=True)
+        (build_dir / "a.bin").write_bytes(b"x" * 10)
+        assert file_manager.get_dir_size(str(build_dir))[1] == 10
+        
+        (build_dir / "b.bin").write_bytes(b"x" * 20)
+        # Guarantee a visible mtime change on coarse-grained filesystems
+        stat_result = build_dir.stat()
+        os.utime(build_dir, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+        
+        assert file_manager.get_dir_size(str(build_dir))[1] == 30
+
+
+class TestLatestBuildInfo:
+    """Test latest build lookup."""
+    
+    def test_latest_build_is_newest_subdirectory(self, file_manager, temp_dir):
+        """Test the most recently modified build folder is returned."""
+        root = temp_dir / "publish" / "Lycoris_main"
+        old_build = root / "20231130_main_0.9.0"
+        new_build = root / "20231201_main_1.0.0"
+        old_build.mkdir(parents=True)
+        new_build.mkdir()
+        (root / "notes.txt").write_text("not a build")
+        os.utime(old_build, (1_700_000_000, 1_700_000_000))
+        os.utime(new_build, (1_700_100_000, 1_700_100_000))
+        
+        found, build_info, latest_dir = file_manager.get_latest_build_info(str(root))
+        
+        assert found
+        assert latest_dir == str(new_build)
+        assert build_info.version == "1.0.0"
+        
+        found, _, _ = file_manager.get_latest_build_info(str(root), after_timestamp=1_700_200_000)
+        assert not found
+    
+    @pytest.mark.asyncio
+    async def test_async_lookup_matches_sync(self, file_manager, temp_dir):
+        """Test the event-loop friendly wrapper returns the same result."""
+        root = temp_dir / "publish" / "Lycoris_main"
+        (root / "20231201_main_1.0.0").mkdir(parents=True)
+        
+        assert await file_manager.get_latest_build_info_async(str(root)) == file_manager.get_latest_build_info(str(root))
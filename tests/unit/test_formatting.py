@@ -0,0 +1,19 @@
+"""
+Unit tests for shared formatting helpers.
+"""
+
+from src.domain.formatting import format_duration
+
+
+class TestFormatDuration:
+    """Test format_duration helper."""
+    
+    def test_minutes_and_seconds(self):
+        """Test durations shorter than an hour."""
+        assert format_duration(0) == "0m 0s"
+        assert format_duration(125) == "2m 5s"
+    
+    def test_hours(self):
+        """Test durations of an hour or more."""
+        assert format_duration(3600) == "1h 0m 0s"
+        assert format_duration(3725) == "1h 2m 5s"
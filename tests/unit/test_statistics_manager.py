@@ -0,0 +1,116 @@
+"""
+Unit tests for the statistics manager.
+"""
+
+import json
+import os
+
+import pytest
+
+from src.application.services.statistics_manager import StatisticsManager
+from src.domain.models.configuration import BuildConfiguration
+
+
+@pytest.fixture
+def stats_manager(temp_dir, mock_logger):
+    """Create a statistics manager writing into a temporary directory."""
+    config = BuildConfiguration(
+        history_file=str(temp_dir / "build_history.json"),
+        max_history_entries=5
+    )
+    return StatisticsManager(config, mock_logger)
+
+
+class TestStatisticsManager:
+    """Test StatisticsManager history persistence."""
+    
+    def test_save_build_time_persists_history(self, stats_manager):
+        """Test that recorded build times are written to the history file."""
+        stats_manager.save_build_time("main_simple", 120.0)
+        stats_manager.save_build_time("main_simple", 180.0)
+        
+        with open(stats_manager.history_file, 'r', encoding='utf-8') as f:
+            assert json.load(f) == {"main_simple": [120.0, 180.0]}
+    
+    def test_save_build_time_keeps_recent_entries(self, stats_manager):
+        """Test that history is trimmed to max_history_entries."""
+        for duration in range(8):
+            stats_manager.save_build_time("main_simple", float(duration))
+        
+        assert list(stats_manager._load_history()["main_simple"]) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    
+    def test_save_build_times_writes_batch(self, stats_manager):
+        """Test recording several build times at once."""
+        stats_manager.save_build_times([("main_simple", 60.0), ("dev_debug", 90.0)])
+        
+        history = stats_manager._load_history()
+        assert list(history["main_simple"]) == [60.0]
+        assert list(history["dev_debug"]) == [90.0]
+    
+    def test_save_leaves_no_temp_file(self, stats_manager):
+        """Test that the atomic write does not leave its temp file behind."""
+        stats_manager.save_build_time("main_simple", 60.0)
+        
+        assert os.listdir(stats_manager.history_file.parent) == [stats_manager.history_file.name]
+    
+    def test_load_history_picks_up_external_changes(self, stats_manager):
+        """Test that the history cache is invalidated when the file changes."""
+        stats_manager.save_build_time("main_simple", 60.0)
+        assert list(stats_manager._load_history()["main_simple"]) == [60.0]
+        
+        with open(stats_manager.history_file, 'w', encoding='utf-8') as f:
+            json.dump({"other": [1.0]}, f)
+        os.utime(stats_manager.history_file, ns=(0, 1))
+        
+        history = stats_manager._load_history()
+        assert list(history) == ["other"]
+        assert list(history["other"]) == [1.0]
+    
+    def test_get_estimated_time(self, stats_manager):
+        """Test estimated time is the formatted average."""
+        assert stats_manager.get_estimated_time("main_simple") == "❓"
+        
+        stats_manager.save_build_time("main_simple", 60.0)
+        stats_manager.save_build_time("main_simple", 120.0)
+        
+        assert stats_manager.get_estimated_time("main_simple") == "1m 30s"
+    
+    def test_get_build_statistics(self, stats_manager):
+        """Test aggregated statistics per build key."""
+        for duration in (100.0, 100.0, 150.0, 150.0):
+            stats_manager.save_build_time("main_simple", duration)
+        
+        stats = stats_manager.get_build_statistics()["main_simple"]
+        assert stats['count'] == 4
+        assert stats['average'] == 125.0
+        assert stats['min'] == 100.0
+        assert stats['max'] == 150.0
+        assert stats['latest'] == 150.0
+        assert stats['trend'] == "increasing"
+    
+    def test_clear_statistics(self, stats_manager):
+        """Test clearing statistics for a single key."""
+        stats_manager.save_build_time("main_simple", 60.0)
+        
+        result = stats_manager.clear_statistics("main_simple")
+        
+        assert result['status'] == 'success'
+        assert stats_manager._load_history() == {}
+    
+    def test_aggregates_refresh_after_save(self, stats_manager):
+        """Test cached aggregates are recomputed when a key receives new times."""
+        stats_manager.save_build_time("main_simple", 100.0)
+        assert stats_manager.get_build_statistics()["main_simple"]['max'] == 100.0
+        
+        stats_manager.save_build_time("main_simple", 300.0)
+        
+        stats = stats_manager.get_build_statistics()["main_simple"]
+        assert stats['max'] == 300.0
+        assert stats['average'] == 200.0
+    
+    @pytest.mark.asyncio
+    async def test_save_build_time_async(self, stats_manager):
+        """Test recording a build time from async code."""
+        await stats_manager.save_build_time_async("main_simple", 42.0)
+        
+        assert list(stats_manager._load_history()["main_simple"]) == [42.0]
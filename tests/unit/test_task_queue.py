@@ -0,0 +1,79 @@
+"""
+Unit tests for the priority task queue.
+"""
+
+import pytest
+
+from src.domain.interfaces.task_queue import QueuePriority
+from src.domain.models.entities import BuildTask, BuildStrategy
+from src.infrastructure.task_management.queue import ThreadSafeTaskQueue
+
+
+def _make_tasks(count):
+    return [BuildTask(branch=f"branch{i}", strategy=BuildStrategy.SIMPLE) for i in range(count)]
+
+
+class TestThreadSafeTaskQueue:
+    """Test ThreadSafeTaskQueue ordering."""
+    
+    @pytest.mark.asyncio
+    async def test_dequeue_orders_by_priority_then_fifo(self, mock_logger):
+        """Test higher priority first, FIFO within the same priority."""
+        queue = ThreadSafeTaskQueue(mock_logger)
+        tasks = _make_tasks(4)
+        
+        await queue.enqueue(tasks[0])
+        await queue.enqueue(tasks[1])
+        await queue.enqueue(tasks[2], QueuePriority.URGENT)
+        await queue.enqueue(tasks[3])
+        
+        order = []
+        while (task := await queue.dequeue()) is not None:
+            order.append(task.branch)
+        
+        assert order == ["branch2", "branch0", "branch1", "branch3"]
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_task_is_skipped(self, mock_logger):
+        """Test tasks cancelled while queued are never dequeued."""
+        queue = ThreadSafeTaskQueue(mock_logger)
+        tasks = _make_tasks(3)
+        for task in tasks:
+            await queue.enqueue(task)
+        
+        assert await queue.cancel_task(tasks[0].task_id)
+        assert await queue.get_queue_size() == 2
+        assert await queue.get_task_position(tasks[2].task_id) == 2
+        
+        assert (await queue.dequeue()).task_id == tasks[1].task_id
+        assert (await queue.dequeue()).task_id == tasks[2].task_id
+        assert await queue.dequeue() is None
+    
+    @pytest.mark.asyncio
+    async def test_peek_skips_cancelled_head(self, mock_logger):
+        """Test peek returns the next live task without removing it."""
+        queue = ThreadSafeTaskQueue(mock_logger)
+        tasks = _make_tasks(2)
+        for task in tasks:
+            await queue.enqueue(task)
+        
+        await queue.cancel_task(tasks[0].task_id)
+        
+        assert (await queue.peek()).task_id == tasks[1].task_id
+        assert await queue.get_queue_size() == 1
+        assert (await queue.dequeue()).task_id == tasks[1].task_id
+    
+    @pytest.mark.asyncio
+    async def test_persisted_tasks_are_restored_in_order(self, mock_logger, temp_dir):
+        """Test queue state survives a reload from the persistence file."""
+        persistence_file = str(temp_dir / "queue.json")
+        queue = ThreadSafeTaskQueue(mock_logger, persistence_file)
+        tasks = _make_tasks(3)
+        for task in tasks:
+            await queue.enqueue(task)
+        
+        restored = ThreadSafeTaskQueue(mock_logger, persistence_file)
+        
+        assert await restored.get_queue_size() == 3
+        for task in tasks:
+            assert (await restored.dequeue()).task_id == task.task_id